@@ -3,6 +3,7 @@
 #     from parsyfiles import xxx
 # from these.
 from parsyfiles.filesystem_mapping import *
+from parsyfiles.filesystem_sources import ArchiveFileSource, InMemoryFileSource
 from parsyfiles.parsing_fw import *
 from parsyfiles.global_config import parsyfiles_global_config
 from parsyfiles.log_utils import *
@@ -12,6 +13,7 @@ from parsyfiles.log_utils import *
 # and then pf.xxx
 __all__ = ['converting_core',
            'filesystem_mapping',
+           'filesystem_sources',
            'parsing_combining_parsers',
            'parsing_core',
            'parsing_core_api',
@@ -1,8 +1,22 @@
+import json
+import re
 from abc import abstractmethod, ABCMeta
+from bisect import bisect_left
+from collections import Mapping, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from fnmatch import translate
 from logging import Logger
-from os import listdir, sep
-from os.path import isfile, join, isdir, dirname, basename, exists, splitext
-from typing import Dict, List, Any, Tuple, Union
+from mmap import mmap, ACCESS_READ
+from os import scandir, sep, stat, fstat, replace, remove
+from os.path import join, dirname, basename, splitext, normpath, exists, abspath
+from shutil import copyfileobj
+from stat import S_ISDIR
+from sys import intern
+from threading import Lock, local
+from tempfile import mkstemp
+from time import time
+from typing import Dict, List, Any, Tuple, Union, Optional, Callable, Iterable, Pattern
 
 from parsyfiles.global_config import GLOBAL_CONFIG
 from parsyfiles.var_checker import check_var
@@ -256,7 +270,11 @@ class PersistedObject(metaclass=ABCMeta):
     """
     Contains all information about an object persisted at a given location. It may be a multifile (in which case it has
     extension MULTIFILE) or a single file (in which cse it has an extension such as .txt, .cfg, etc.
+
+    There is one PersistedObject per file of the parsed tree, so this class and its subclasses declare __slots__ to
+    save memory.
     """
+    __slots__ = ('location', 'is_singlefile', 'ext')
 
     def __init__(self, location: str, is_singlefile: bool, ext: str):
         """
@@ -275,7 +293,8 @@ class PersistedObject(metaclass=ABCMeta):
         self.is_singlefile = is_singlefile
         # -- ext
         check_var(ext, var_types=str, var_name='ext')
-        self.ext = ext
+        # file extensions are shared by many objects: intern them
+        self.ext = ext if ext is MULTIFILE_EXT else intern(ext)
         # -- sanity check
         if (is_singlefile and self.ext is MULTIFILE_EXT) or (not is_singlefile and self.ext is not MULTIFILE_EXT):
             raise ValueError('Inconsistent object definition : is_singlefile and self.ext should be consistent')
@@ -373,6 +392,445 @@ class FolderAndFilesStructureError(Exception):
                                             + found_size + ' files')
 
 
+class VirtualFilePath(object):
+    """
+    The path of a singlefile that is not a regular file on the local filesystem, for example a member of an archive.
+    It is displayed as its path, but it can not be opened with open(): use open_singlefile (or singlefile_on_disk for
+    code that really needs a local file) instead.
+
+    Note that this is voluntarily not a subclass of str: the parsing framework explores the subclasses of the desired
+    types (see get_all_subclasses), and this class should not appear there.
+    """
+
+    def __init__(self, path: str, open_stream: Callable[[bool, str], Any]):
+        """
+        Creates a virtual path
+
+        :param path: the path, used as the string representation of this object
+        :param open_stream: a function open_stream(binary: bool, encoding: str) returning an open stream on the file
+        contents, in binary mode if binary is True, or in text mode with the given encoding otherwise
+        """
+        self.path = path
+        self.open_stream = open_stream
+
+    def __str__(self):
+        return self.path
+
+    def __repr__(self):
+        return 'VirtualFilePath(' + repr(self.path) + ')'
+
+
+def open_singlefile(file_path: Union[str, VirtualFilePath], encoding: str, binary: bool = False):
+    """
+    Opens the singlefile at file_path for reading, in text mode with the given encoding or in binary mode. This works
+    both for regular files and for VirtualFilePath objects.
+
+    :param file_path:
+    :param encoding:
+    :param binary:
+    :return: an open stream, that the caller should close
+    """
+    if isinstance(file_path, VirtualFilePath):
+        return file_path.open_stream(binary, encoding)
+    elif binary:
+        return open(file_path, 'rb')
+    else:
+        return open(file_path, 'r', encoding=encoding)
+
+
+@contextmanager
+def singlefile_buffer(file_path: Union[str, VirtualFilePath]):
+    """
+    A context manager providing the contents of the singlefile at file_path as a read-only bytes-like object, without
+    decoding it. Regular files are memory-mapped so that their contents are only read from disk when accessed; the
+    mapping is closed when the context manager exits, so no reference to it (such as a memoryview) should be kept
+    after that. The contents of VirtualFilePath objects are provided as bytes.
+
+    :param file_path:
+    :return:
+    """
+    if isinstance(file_path, VirtualFilePath):
+        with open_singlefile(file_path, None, binary=True) as stream:
+            yield stream.read()
+    else:
+        with open(file_path, 'rb') as file_object:
+            if fstat(file_object.fileno()).st_size == 0:
+                # empty files can not be memory-mapped
+                yield b''
+            else:
+                file_map = mmap(file_object.fileno(), 0, access=ACCESS_READ)
+                try:
+                    yield file_map
+                finally:
+                    file_map.close()
+
+
+@contextmanager
+def singlefile_on_disk(file_path: Union[str, VirtualFilePath]):
+    """
+    A context manager providing a path to a regular file on the local filesystem with the contents of the singlefile
+    at file_path. For regular files this is file_path itself. For VirtualFilePath objects the contents are copied to a
+    temporary file, that is removed when the context manager exits.
+
+    :param file_path:
+    :return:
+    """
+    if not isinstance(file_path, VirtualFilePath):
+        yield file_path
+    else:
+        suffix = splitext(file_path.path)[1]
+        tmp_fd, tmp_path = mkstemp(suffix=suffix)
+        try:
+            with open(tmp_fd, 'wb') as tmp_file, open_singlefile(file_path, None, binary=True) as src:
+                copyfileobj(src, tmp_file)
+            yield tmp_path
+        finally:
+            remove(tmp_path)
+
+
+class DirectorySnapshot(object):
+    """
+    A snapshot of the contents of a folder, listed exactly once. It knows the names of the files and subfolders, and
+    indexes the files by stem (file name without its last extension) so that all extensions available for a given
+    item can be retrieved without listing the folder again. A sorted list of the file names is also built on demand,
+    so that the files starting with a given prefix can be found by bisection.
+    """
+
+    def __init__(self, dir_path: str, file_names: List[str], folder_names: List[str]):
+        """
+        Constructor from the already-listed contents of a folder. Use DirectorySnapshot.create(dir_path) to list a
+        folder on the filesystem.
+
+        :param dir_path: the path of the folder, as provided by the caller
+        :param file_names: the names of all files in the folder
+        :param folder_names: the names of all subfolders in the folder
+        """
+        self.dir_path = dir_path
+        self.file_names = file_names
+        self.folder_names = set(folder_names)
+
+        # -- index the files by stem: {stem: {ext: file_name}}
+        self.files_by_stem = dict()
+        for file_name in file_names:
+            if EXT_SEPARATOR in file_name:
+                idx = file_name.rindex(EXT_SEPARATOR)
+                self.files_by_stem.setdefault(file_name[0:idx], dict())[file_name[idx:]] = file_name
+
+        # -- the sorted file names, only built when first needed (see get_file_names_with_prefix)
+        self._sorted_file_names = None
+
+    @staticmethod
+    def create(dir_path: str):
+        """
+        Lists the folder at dir_path on the filesystem and returns the corresponding snapshot
+
+        :param dir_path:
+        :return:
+        """
+        file_names = []
+        folder_names = []
+        # scandir provides the entry type along with the name: on most platforms this does not require an additional
+        # system call per entry, contrary to listdir + isdir/isfile
+        for entry in scandir(dir_path):
+            if entry.is_dir():
+                folder_names.append(entry.name)
+            elif entry.is_file():
+                file_names.append(entry.name)
+        return DirectorySnapshot(dir_path, file_names, folder_names)
+
+    @staticmethod
+    def create_if_folder(dir_path: str):
+        """
+        Same than create(dir_path) but returns None if dir_path does not exist or is not a folder. This saves the cost
+        of an additional isdir() call before listing the folder.
+
+        :param dir_path:
+        :return:
+        """
+        try:
+            return DirectorySnapshot.create(dir_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def get_file_exts_for_stem(self, stem: str) -> Dict[str, str]:
+        """
+        Returns all files in this folder named <stem>.<ext>, where <ext> does not contain any EXT_SEPARATOR
+
+        :param stem:
+        :return: a dictionary of {ext: file_name}
+        """
+        return self.files_by_stem.get(stem, dict())
+
+    def get_file_names_with_prefix(self, prefix: str) -> List[str]:
+        """
+        Returns the names of all files in this folder starting with prefix, in alphabetical order. This relies on a
+        bisection in the sorted list of file names, so its cost is proportional to the size of the result and not to
+        the number of files in the folder.
+
+        :param prefix:
+        :return:
+        """
+        if self._sorted_file_names is None:
+            self._sorted_file_names = sorted(self.file_names)
+        sorted_names = self._sorted_file_names
+
+        start = bisect_left(sorted_names, prefix)
+        end = start
+        while end < len(sorted_names) and sorted_names[end].startswith(prefix):
+            end += 1
+        return sorted_names[start:end]
+
+    def has_file(self, file_name: str) -> bool:
+        """
+        :param file_name:
+        :return: True if this folder contains a file named file_name
+        """
+        return file_name in self.get_file_names_with_prefix(file_name)
+
+
+class FolderScanManifest(object):
+    """
+    A persistent record of the folders listed during previous scans, stored in a json file. Each folder is recorded
+    with its modification time: as long as this time does not change, the folder contents (names of files and
+    subfolders) are known without listing it again. This is typically useful for processes that are restarted often
+    and parse the same, mostly unchanged, file tree each time.
+
+    Note that only the folder structure is recorded, not the file contents, which are always read from the filesystem.
+    """
+
+    # version of the manifest file format
+    FORMAT_VERSION = 1
+
+    # a folder modified less than this number of nanoseconds before it was listed may have been modified again
+    # without its modification time changing (coarse filesystem timestamps) : such entries are never trusted.
+    RACY_DELAY_NS = 2 * 10**9
+
+    def __init__(self, manifest_file: str):
+        """
+        Constructor. The manifest file is loaded the first time it is needed, and created if it does not exist.
+
+        :param manifest_file: path of the json file where the manifest should be persisted
+        """
+        check_var(manifest_file, var_types=str, var_name='manifest_file')
+        self.manifest_file = manifest_file
+        self._folders = None
+        self._modified = False
+        # held while the known folders are loaded, updated or saved, since folders may be listed by several threads
+        # (see scan_threads in AbstractFileMappingConfiguration)
+        self._lock = Lock()
+
+    def _get_folders(self) -> Dict[str, List[Any]]:
+        """
+        Returns the dictionary of known folders {abs_path: [mtime_ns, listed_at_ns, file_names, folder_names]},
+        loading it from the manifest file the first time. An unreadable or incompatible file is simply ignored.
+
+        :return:
+        """
+        if self._folders is None:
+            with self._lock:
+                if self._folders is None:
+                    folders = dict()
+                    if exists(self.manifest_file):
+                        try:
+                            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                                contents = json.load(f)
+                            if contents.get('version', None) == FolderScanManifest.FORMAT_VERSION:
+                                folders = contents['folders']
+                        except (OSError, ValueError, KeyError, AttributeError):
+                            pass
+                    self._folders = folders
+        return self._folders
+
+    def get_snapshot(self, dir_path: str) -> Optional['DirectorySnapshot']:
+        """
+        Returns a DirectorySnapshot for the folder at dir_path, or None if it is not a folder. The folder is listed
+        only if it is unknown or if its modification time has changed since it was recorded.
+
+        :param dir_path:
+        :return:
+        """
+        try:
+            st = stat(dir_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not S_ISDIR(st.st_mode):
+            return None
+
+        folders = self._get_folders()
+        key = abspath(dir_path)
+        entry = folders.get(key, None)
+        if entry is not None and entry[0] == st.st_mtime_ns \
+                and (entry[1] - entry[0]) > FolderScanManifest.RACY_DELAY_NS:
+            return DirectorySnapshot(dir_path, entry[2], entry[3])
+
+        # unknown or modified: list it and record it
+        listed_at_ns = int(time() * 10**9)
+        snapshot = DirectorySnapshot.create(dir_path)
+        with self._lock:
+            folders[key] = [st.st_mtime_ns, listed_at_ns, snapshot.file_names, sorted(snapshot.folder_names)]
+            self._modified = True
+        return snapshot
+
+    def save(self):
+        """
+        Writes the manifest file if anything changed since it was loaded. The file is first written to a temporary
+        file with a unique name in the same folder and then moved, so that concurrent readers never see a partial
+        manifest, even if several processes save it at the same time (the last one wins).
+
+        :return:
+        """
+        with self._lock:
+            if self._modified:
+                tmp_fd, tmp_file = mkstemp(dir=dirname(abspath(self.manifest_file)),
+                                           prefix=basename(self.manifest_file) + '.', suffix='.tmp')
+                try:
+                    with open(tmp_fd, 'w', encoding='utf-8') as f:
+                        json.dump({'version': FolderScanManifest.FORMAT_VERSION, 'folders': self._folders}, f,
+                                  separators=(',', ':'))
+                    replace(tmp_file, self.manifest_file)
+                except BaseException:
+                    remove(tmp_file)
+                    raise
+                self._modified = False
+
+
+class FileSource(metaclass=ABCMeta):
+    """
+    The source of the files and folders seen by a FileMappingConfiguration. The default is the local filesystem
+    (LocalFileSource), but file mapping configurations may also work on the contents of an archive, or on an in-memory
+    tree of files (see filesystem_sources).
+    """
+
+    @abstractmethod
+    def create_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Implementing classes should return a DirectorySnapshot of the folder at dir_path, or None if dir_path is not a
+        folder.
+
+        :param dir_path:
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def get_singlefile_path(self, file_path: str) -> Union[str, VirtualFilePath]:
+        """
+        Implementing classes should return the path of the singlefile at file_path, as it will be provided to the
+        parsers. It should be a VirtualFilePath if the file is not a regular file on the local filesystem.
+
+        :param file_path:
+        :return:
+        """
+        pass
+
+
+class LocalFileSource(FileSource):
+    """
+    The default FileSource: files and folders of the local filesystem.
+    """
+
+    def __str__(self):
+        return 'local filesystem'
+
+    def create_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Implementation of the parent method: lists the folder on the filesystem
+
+        :param dir_path:
+        :return:
+        """
+        return DirectorySnapshot.create_if_folder(dir_path)
+
+    def get_singlefile_path(self, file_path: str) -> Union[str, VirtualFilePath]:
+        """
+        Implementation of the parent method: files are regular files
+
+        :param file_path:
+        :return:
+        """
+        return file_path
+
+
+_RegexType = type(re.compile(''))
+
+
+def _compile_name_patterns(patterns: Union[str, Pattern, Iterable[Union[str, Pattern]]], var_name: str) \
+        -> Optional[List[Pattern]]:
+    """
+    Compiles the provided file or folder name patterns into a list of regular expressions matching whole names.
+    Patterns may be glob-style strings ('*.bak', '.git', 'data_*') or compiled regular expressions.
+
+    :param patterns: a pattern or an iterable of patterns, or None
+    :param var_name: the name of the variable, for error messages
+    :return: None if patterns is None, or the list of compiled regular expressions
+    """
+    if patterns is None:
+        return None
+    if isinstance(patterns, (str, _RegexType)):
+        patterns = [patterns]
+
+    compiled = []
+    for pattern in patterns:
+        check_var(pattern, var_types=(str, _RegexType), var_name=var_name)
+        compiled.append(re.compile(translate(pattern)) if isinstance(pattern, str) else pattern)
+    return compiled
+
+
+class LazyMultifileChildren(Mapping):
+    """
+    A read-only mapping {child_name: PersistedObject} of the children of a multifile object, where each child
+    PersistedObject is only created (and therefore its location only scanned) the first time it is accessed. The names
+    of the children are known from the start.
+    """
+
+    def __init__(self, children_locations: Dict[str, str], create_child: Callable[[str], PersistedObject]):
+        """
+        Constructor with the dictionary of children locations {child_name: child_location} and the method to use to
+        create a child PersistedObject from its location
+
+        :param children_locations:
+        :param create_child:
+        """
+        check_var(children_locations, var_types=dict, var_name='children_locations')
+        self._children_locations = OrderedDict(sorted(children_locations.items()))
+        check_var(create_child, var_types=Callable, var_name='create_child')
+        self._create_child = create_child
+        self._children = dict()
+
+    def __getitem__(self, child_name: str) -> PersistedObject:
+        try:
+            return self._children[child_name]
+        except KeyError:
+            # not yet created (if child_name is unknown the KeyError below is the expected behaviour)
+            child = self._create_child(self._children_locations[child_name])
+            self._children[child_name] = child
+            return child
+
+    def __contains__(self, child_name):
+        # do not rely on Mapping's implementation, that would create the child
+        return child_name in self._children_locations
+
+    def __len__(self):
+        return len(self._children_locations)
+
+    def __iter__(self):
+        return iter(self._children_locations)
+
+    def __repr__(self):
+        return 'LazyMultifileChildren(' + str(list(self._children_locations.keys())) + ')'
+
+    def is_loaded(self, child_name: str) -> bool:
+        """
+        :param child_name:
+        :return: True if the child named child_name has already been created
+        """
+        return child_name in self._children
+
+
+# the scan sessions open in each thread: id of the FileMappingConfiguration > folder snapshots. See _scan_session
+_scan_sessions = local()
+
+
 class FileMappingConfiguration(AbstractFileMappingConfiguration):
     """
     Abstract class for all file mapping configurations. In addition to be an AbstractFileMappingConfiguration (meaning
@@ -383,8 +841,10 @@ class FileMappingConfiguration(AbstractFileMappingConfiguration):
         """
         Represents an object on the filesystem. It may be multifile or singlefile. When this object is created it
         recursively scans all of its children if any, and builds the corresponding PersistedObjects. All of this is
-        logged on the provided logger if any.
+        logged on the provided logger if any. If the file mapping configuration has lazy_scan enabled, the children
+        are only scanned and built when they are first accessed (see LazyMultifileChildren).
         """
+        __slots__ = ('file_mapping_conf', 'logger', '_contents_or_path', 'children')
 
         def __init__(self, location: str, file_mapping_conf: AbstractFileMappingConfiguration = None,
                      logger: Logger = None, log_only_last: bool = False):
@@ -420,9 +880,15 @@ class FileMappingConfiguration(AbstractFileMappingConfiguration):
 
                 # -- create and attach all the self.children if multifile
                 if not self.is_singlefile:
-                    self.children = {name: FileMappingConfiguration.RecursivePersistedObject(loc,
-                                     file_mapping_conf=self.file_mapping_conf, logger=self.logger, log_only_last=True)
-                                     for name, loc in sorted(self._contents_or_path.items())}
+                    if self.file_mapping_conf.lazy_scan:
+                        # lazy: the children will be created when first accessed, reusing the current scan session
+                        scan_session = self.file_mapping_conf._get_scan_session()
+                        self.children = LazyMultifileChildren(
+                            self._contents_or_path,
+                            create_child=lambda loc: self._create_child_in_session(loc, scan_session))
+                    else:
+                        self.children = {name: self._create_child(loc)
+                                         for name, loc in sorted(self._contents_or_path.items())}
 
             except (ObjectNotFoundOnFileSystemError, ObjectPresentMultipleTimesOnFileSystemError,
                     IllegalContentNameError) as e:
@@ -431,13 +897,36 @@ class FileMappingConfiguration(AbstractFileMappingConfiguration):
                     logger.debug(location)
                 raise e.with_traceback(e.__traceback__)
 
+        def _create_child(self, child_location: str) -> PersistedObject:
+            """
+            Creates the PersistedObject for a child of this multifile object.
+
+            :param child_location:
+            :return:
+            """
+            return FileMappingConfiguration.RecursivePersistedObject(child_location,
+                                                                     file_mapping_conf=self.file_mapping_conf,
+                                                                     logger=self.logger, log_only_last=True)
+
+        def _create_child_in_session(self, child_location: str, scan_session: Dict[str, DirectorySnapshot]):
+            """
+            Creates the PersistedObject for a child of this multifile object, reusing the folder snapshots of the scan
+            that created this object. Used in lazy scan mode.
+
+            :param child_location:
+            :param scan_session:
+            :return:
+            """
+            with self.file_mapping_conf._scan_session(scan_session, logger=self.logger):
+                return self._create_child(child_location)
+
         def get_singlefile_path(self):
             """
             Implementation of the parent method
             :return:
             """
             if self.is_singlefile:
-                return self._contents_or_path
+                return self.file_mapping_conf.file_source.get_singlefile_path(self._contents_or_path)
             else:
                 raise NotImplementedError(
                     'get_file_path_no_ext does not make any sense on a multifile object. Use object.location'
@@ -466,17 +955,59 @@ class FileMappingConfiguration(AbstractFileMappingConfiguration):
             else:
                 return self.children
 
-    def __init__(self, encoding:str = None):
+    def __init__(self, encoding:str = None, manifest_file: str = None, lazy_scan: bool = False,
+                 scan_threads: int = None, file_source: FileSource = None,
+                 include: Iterable[Union[str, Pattern]] = None, exclude: Iterable[Union[str, Pattern]] = None):
         """
         Constructor, with the encoding registered to open the files.
         :param encoding: the encoding used to open the files default is 'utf-8'
+        :param manifest_file: an optional path to a json file where the structure of the scanned folders will be
+        persisted, along with their modification time. If provided, next scans (even in another process) will only
+        list the folders that were modified. Default is None (no manifest)
+        :param lazy_scan: if True, the children of multifile objects are only scanned when they are first accessed,
+        instead of scanning the whole tree when the root object is created. Note that in this mode, errors in the file
+        structure of a child (for example an object present several times) are only raised when this child is
+        accessed. Default is False
+        :param scan_threads: an optional maximum number of threads used to list the folders of the tree in parallel
+        before building the PersistedObjects. This is useful on high-latency filesystems (network drives...). The
+        resulting objects and errors are the same than with a sequential scan. Default is None (sequential scan).
+        This option has no effect when lazy_scan is True.
+        :param file_source: an optional FileSource where the files and folders should be found, for example an
+        archive (see filesystem_sources). Default is None (the local filesystem). Note that manifest_file can only be
+        used with the local filesystem.
+        :param include: an optional list of file name patterns. If provided, only the files with a name matching one of
+        them are taken into account. Folders are not concerned. Patterns may be glob-style strings ('*.cfg') or
+        compiled regular expressions, that should match the whole name. Default is None (all files)
+        :param exclude: an optional list of file or folder name patterns, in the same format than include. Files and
+        folders with a name matching one of them are ignored: excluded folders are never listed, and excluded files
+        can not create any conflict. Default is None (nothing excluded)
         """
         super(FileMappingConfiguration, self).__init__(encoding)
 
+        # -- scan filters
+        self._include = _compile_name_patterns(include, 'include')
+        self._exclude = _compile_name_patterns(exclude, 'exclude')
+
+        check_var(file_source, var_types=FileSource, var_name='file_source', enforce_not_none=False)
+        self.file_source = file_source or LocalFileSource()
+        if manifest_file is not None and not isinstance(self.file_source, LocalFileSource):
+            raise ValueError('A manifest_file can only be used with files from the local filesystem, found file_source='
+                             + str(self.file_source))
+
+        check_var(lazy_scan, var_types=bool, var_name='lazy_scan')
+        self.lazy_scan = lazy_scan
+
+        check_var(scan_threads, var_types=int, var_name='scan_threads', enforce_not_none=False, min_value=1)
+        self.scan_threads = scan_threads
+
+        # the optional persistent manifest
+        check_var(manifest_file, var_types=str, var_name='manifest_file', enforce_not_none=False)
+        self.manifest = FolderScanManifest(manifest_file) if manifest_file is not None else None
+
     def create_persisted_object(self, location: str, logger: Logger) -> PersistedObject:
         """
         Creates a PersistedObject representing the object at location 'location', and recursively creates all of its
-        children
+        children. During this scan each folder is listed only once.
 
         :param location:
         :param logger:
@@ -484,23 +1015,202 @@ class FileMappingConfiguration(AbstractFileMappingConfiguration):
         """
         #print('Checking all files under ' + location)
         logger.debug('Checking all files under [{loc}]'.format(loc=location))
-        obj = FileMappingConfiguration.RecursivePersistedObject(location=location, file_mapping_conf=self,
-                                                                logger=logger)
+
+        # -- open a scan session so that each folder is listed at most once
+        with self._scan_session(logger=logger):
+            # -- optionally list all folders in parallel first, the objects are then built from the snapshots
+            if self.scan_threads is not None and self.scan_threads > 1 and not self.lazy_scan:
+                self._prefetch_dir_snapshots(location)
+
+            obj = FileMappingConfiguration.RecursivePersistedObject(location=location, file_mapping_conf=self,
+                                                                    logger=logger)
+
         #print('File checks done')
         logger.debug('File checks done')
         return obj
 
+    def _get_scan_session(self) -> Optional[Dict[str, DirectorySnapshot]]:
+        """
+        Returns the folder snapshots of the scan session currently open with this configuration in this thread, if
+        any. See _scan_session.
+
+        :return:
+        """
+        return getattr(_scan_sessions, 'sessions', dict()).get(id(self), None)
+
+    @contextmanager
+    def _scan_session(self, dir_snapshots: Dict[str, DirectorySnapshot] = None, logger: Logger = None):
+        """
+        A context manager opening a scan session: during the session, the snapshot of each listed folder is remembered
+        in a dictionary so that it is listed only once. The provided dir_snapshots dictionary is used if any (to
+        continue a previous session, for lazy scan). Otherwise, if a session is already open it is reused, or a new one
+        is opened. When the session closes, the manifest if any is saved.
+
+        Sessions are specific to the current thread, so that a configuration may be shared by several threads, each
+        seeing the folders as they were when its own scan started.
+
+        :param dir_snapshots:
+        :param logger:
+        :return:
+        """
+        try:
+            sessions = _scan_sessions.sessions
+        except AttributeError:
+            sessions = _scan_sessions.sessions = dict()
+
+        previous = sessions.get(id(self), None)
+        if dir_snapshots is None and previous is not None:
+            # an inner scan: reuse the session
+            yield previous
+            return
+
+        sessions[id(self)] = dir_snapshots if dir_snapshots is not None else dict()
+        try:
+            yield sessions[id(self)]
+        finally:
+            if previous is None:
+                del sessions[id(self)]
+            else:
+                sessions[id(self)] = previous
+            if self.manifest is not None:
+                try:
+                    self.manifest.save()
+                except OSError as e:
+                    if logger is not None:
+                        logger.warning('Could not save the folder scan manifest to [{f}]: {e}'
+                                       ''.format(f=self.manifest.manifest_file, e=e))
+
+    def _prefetch_dir_snapshots(self, location: str):
+        """
+        Lists the folder at location and all the relevant subfolders (see _get_subfolders_to_scan) using a pool of
+        self.scan_threads threads, and stores the resulting snapshots in the current scan session. Folders that can not
+        be listed are simply skipped here: the error will be raised as usual during the sequential scan that follows.
+
+        :param location:
+        :return:
+        """
+        snapshots = self._get_scan_session()
+        with ThreadPoolExecutor(max_workers=self.scan_threads) as executor:
+            pending = {executor.submit(self._create_dir_snapshot, location): location}
+            while len(pending) > 0:
+                done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_path = pending.pop(future)
+                    try:
+                        snapshot = future.result()
+                    except OSError:
+                        continue
+                    snapshots[normpath(dir_path)] = snapshot
+                    if snapshot is not None:
+                        for subfolder_path in self._get_subfolders_to_scan(snapshot):
+                            if normpath(subfolder_path) not in snapshots:
+                                pending[executor.submit(self._create_dir_snapshot, subfolder_path)] = subfolder_path
+
+    def _get_subfolders_to_scan(self, snapshot: DirectorySnapshot) -> List[str]:
+        """
+        Returns the paths of the subfolders of the given folder snapshot, that a scan of this folder will need to list.
+        By default there are none: subclasses where subfolders are relevant should override this.
+
+        :param snapshot:
+        :return:
+        """
+        return []
+
+    def _get_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Returns a DirectorySnapshot of the folder at dir_path, or None if dir_path is not a folder. During a scan (see
+        create_persisted_object), snapshots are remembered so that each folder is listed only once, and the knowledge
+        of the parent folder snapshot is used to know if dir_path is a folder without any additional filesystem call.
+        Outside of a scan, the folder is listed again at each call.
+
+        :param dir_path:
+        :return:
+        """
+        snapshots = self._get_scan_session()
+        if snapshots is None:
+            return self._create_dir_snapshot(dir_path)
+
+        key = normpath(dir_path)
+        try:
+            return snapshots[key]
+        except KeyError:
+            # -- is it a folder ? If the parent folder was already listed, use it
+            parent_key = dirname(key) or '.'
+            parent_snapshot = snapshots.get(parent_key, None) \
+                if (parent_key != key and basename(key) not in {'', '.', '..'}) else None
+            if parent_snapshot is None or basename(key) in parent_snapshot.folder_names:
+                snapshot = self._create_dir_snapshot(dir_path)
+            else:
+                snapshot = None
+            snapshots[key] = snapshot
+            return snapshot
+
+    def _create_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Creates a DirectorySnapshot of the folder at dir_path, or returns None if dir_path is not a folder. If a
+        manifest is configured, it is used to avoid listing folders that did not change since last time. The include
+        and exclude filters are then applied to the snapshot.
+
+        :param dir_path:
+        :return:
+        """
+        if self.manifest is not None:
+            snapshot = self.manifest.get_snapshot(dir_path)
+        else:
+            snapshot = self.file_source.create_dir_snapshot(dir_path)
+
+        if snapshot is None or (self._include is None and self._exclude is None):
+            return snapshot
+        else:
+            # apply the scan filters, so that the rest of the scan never sees the ignored files and folders
+            return DirectorySnapshot(snapshot.dir_path,
+                                     [name for name in snapshot.file_names if self._is_scanned(name, is_folder=False)],
+                                     [name for name in snapshot.folder_names if self._is_scanned(name, is_folder=True)])
+
+    def _is_scanned(self, name: str, is_folder: bool) -> bool:
+        """
+        Returns True if the file or folder with the given name should be taken into account, according to the include
+        and exclude filters of this configuration.
+
+        :param name:
+        :param is_folder:
+        :return:
+        """
+        if self._exclude is not None and any(pattern.fullmatch(name) for pattern in self._exclude):
+            return False
+        elif is_folder or self._include is None:
+            return True
+        else:
+            return any(pattern.fullmatch(name) for pattern in self._include)
+
 
 class WrappedFileMappingConfiguration(FileMappingConfiguration):
     """
     A file mapping where multifile objects are represented by folders
     """
-    def __init__(self, encoding:str = None):
+    def __init__(self, encoding:str = None, manifest_file: str = None, lazy_scan: bool = False,
+                 scan_threads: int = None, file_source: FileSource = None,
+                 include: Iterable[Union[str, Pattern]] = None, exclude: Iterable[Union[str, Pattern]] = None):
         """
         Constructor, with the encoding registered to open the files.
         :param encoding: the encoding used to open the files default is 'utf-8'
-        """
-        super(WrappedFileMappingConfiguration, self).__init__(encoding=encoding)
+        :param manifest_file: an optional path to a json file used to persist the scanned folder structure across
+        runs. See FileMappingConfiguration
+        :param lazy_scan: if True, the children of multifile objects are only scanned when first accessed. See
+        FileMappingConfiguration
+        :param scan_threads: an optional number of threads used to list the subfolders in parallel. See
+        FileMappingConfiguration
+        :param file_source: an optional FileSource where the files and folders should be found, for example an
+        archive. Default is the local filesystem. See FileMappingConfiguration
+        :param include: an optional list of file name patterns ('*.cfg'). Only matching files are taken into account.
+        See FileMappingConfiguration
+        :param exclude: an optional list of file or folder name patterns ('.git', '*.bak'). Matching files and folders
+        are ignored. See FileMappingConfiguration
+        """
+        super(WrappedFileMappingConfiguration, self).__init__(encoding=encoding, manifest_file=manifest_file,
+                                                              lazy_scan=lazy_scan, scan_threads=scan_threads,
+                                                              file_source=file_source, include=include,
+                                                              exclude=exclude)
 
     def find_multifile_object_children(self, parent_location, no_errors: bool = False) -> Dict[str, str]:
         """
@@ -522,8 +1232,9 @@ class WrappedFileMappingConfiguration(FileMappingConfiguration):
         :return: a dictionary of {item_name : item_prefix}
         """
 
-        # (1) Assert that folder_path is a folder
-        if not isdir(parent_location):
+        # (1) Assert that folder_path is a folder, and get its contents (listed once)
+        snapshot = self._get_dir_snapshot(parent_location)
+        if snapshot is None:
             if no_errors:
                 return dict()
             else:
@@ -532,17 +1243,11 @@ class WrappedFileMappingConfiguration(FileMappingConfiguration):
 
         else:
             # (2) List folders (multifile objects or collections)
-            all_subfolders = [dir_ for dir_ in listdir(parent_location) if isdir(join(parent_location, dir_))]
-            items = {item_name: join(parent_location, item_name) for item_name in all_subfolders}
+            items = {item_name: join(parent_location, item_name) for item_name in snapshot.folder_names}
 
             # (3) List singlefiles *without* their extension
-            items.update({
-                          item_name: join(parent_location, item_name)
-                          for item_name in [file_name[0:file_name.rindex(EXT_SEPARATOR)]
-                                            for file_name in listdir(parent_location)
-                                            if isfile(join(parent_location, file_name))
-                                            and EXT_SEPARATOR in file_name]
-                         })
+            items.update({item_name: join(parent_location, item_name) for item_name in snapshot.files_by_stem.keys()})
+
         # (4) return all
         return items
 
@@ -554,7 +1259,17 @@ class WrappedFileMappingConfiguration(FileMappingConfiguration):
         :param location:
         :return:
         """
-        return isdir(location) and len(self.find_multifile_object_children(location)) == 0
+        snapshot = self._get_dir_snapshot(location)
+        return snapshot is not None and len(snapshot.folder_names) == 0 and len(snapshot.files_by_stem) == 0
+
+    def _get_subfolders_to_scan(self, snapshot: DirectorySnapshot) -> List[str]:
+        """
+        Implementation of the parent method: in this mode all subfolders are multifile children.
+
+        :param snapshot:
+        :return:
+        """
+        return [join(snapshot.dir_path, folder_name) for folder_name in sorted(snapshot.folder_names)]
 
     def get_multifile_object_child_location(self, parent_item_prefix: str, child_name: str) -> str:
         """
@@ -568,7 +1283,7 @@ class WrappedFileMappingConfiguration(FileMappingConfiguration):
         check_var(child_name, var_types=str, var_name='item_name')
 
         # assert that folder_path is a folder
-        if not isdir(parent_item_prefix):
+        if self._get_dir_snapshot(parent_item_prefix) is None:
             raise ValueError(
                 'Cannot get attribute item in non-flat mode, parent item path is not a folder : ' + parent_item_prefix)
         return join(parent_item_prefix, child_name)
@@ -585,14 +1300,12 @@ class WrappedFileMappingConfiguration(FileMappingConfiguration):
             parent_dir = '.'
         base_prefix = basename(location)
 
-        possible_object_files = {object_file[len(base_prefix):]: join(parent_dir, object_file)
-                                 for object_file in listdir(parent_dir) if
-                                 isfile(parent_dir + '/' + object_file)
-                                 and object_file.startswith(base_prefix)
-                                 # file must be named base_prefix.something
-                                 and object_file != base_prefix
-                                 and object_file[len(base_prefix)] == EXT_SEPARATOR
-                                 and (object_file[len(base_prefix):]).count(EXT_SEPARATOR) == 1}
+        # file must be named base_prefix.something, with no other EXT_SEPARATOR in the something
+        snapshot = self._get_dir_snapshot(parent_dir)
+        if snapshot is None:
+            raise FileNotFoundError('Cannot list the contents of folder \'' + parent_dir + '\'')
+        possible_object_files = {ext: join(parent_dir, object_file)
+                                 for ext, object_file in snapshot.get_file_exts_for_stem(base_prefix).items()}
 
         return possible_object_files
 
@@ -603,13 +1316,30 @@ class FlatFileMappingConfiguration(FileMappingConfiguration):
     with their parent name as the prefix, followed by a configurable separator.
     """
 
-    def __init__(self, separator: str = None, encoding:str = None):
+    def __init__(self, separator: str = None, encoding:str = None, manifest_file: str = None,
+                 lazy_scan: bool = False, scan_threads: int = None, file_source: FileSource = None,
+                 include: Iterable[Union[str, Pattern]] = None, exclude: Iterable[Union[str, Pattern]] = None):
         """
         :param separator: the character sequence used to separate an item name from an item attribute name. Only
         used in flat mode. Default is '.'
         :param encoding: encoding used to open the files. Default is 'utf-8'
-        """
-        super(FlatFileMappingConfiguration, self).__init__(encoding=encoding)
+        :param manifest_file: an optional path to a json file used to persist the scanned folder structure across
+        runs. See FileMappingConfiguration
+        :param lazy_scan: if True, the children of multifile objects are only scanned when first accessed. See
+        FileMappingConfiguration
+        :param scan_threads: an optional number of threads used to list the folders in parallel. See
+        FileMappingConfiguration. Note that in flat mode all files of an object are in the same folder, so this has
+        little effect.
+        :param file_source: an optional FileSource where the files and folders should be found, for example an
+        archive. Default is the local filesystem. See FileMappingConfiguration
+        :param include: an optional list of file name patterns ('*.cfg'). Only matching files are taken into account.
+        See FileMappingConfiguration
+        :param exclude: an optional list of file or folder name patterns ('*.bak'). Matching files are ignored. See
+        FileMappingConfiguration
+        """
+        super(FlatFileMappingConfiguration, self).__init__(encoding=encoding, manifest_file=manifest_file,
+                                                           lazy_scan=lazy_scan, scan_threads=scan_threads,
+                                                           file_source=file_source, include=include, exclude=exclude)
 
         # -- check separator
         check_var(separator, var_types=str, var_name='sep_for_flat', enforce_not_none=False, min_len=1)
@@ -650,7 +1380,8 @@ class FlatFileMappingConfiguration(FileMappingConfiguration):
             parent_location = '.'
 
         # (1) Find the base directory and base name
-        if isdir(parent_location):  # special case: parent location is the root folder where all the files are.
+        snapshot = self._get_dir_snapshot(parent_location)
+        if snapshot is not None:  # special case: parent location is the root folder where all the files are.
             parent_dir = parent_location
             base_prefix = ''
             start_with = ''
@@ -663,17 +1394,17 @@ class FlatFileMappingConfiguration(FileMappingConfiguration):
             # "just" use basename() rather than replacing os separators with our separator:
             base_prefix = basename(parent_location)  # --> so it should already include self.separator to be valid
             start_with = self.separator
+            snapshot = self._get_dir_snapshot(parent_dir)
+            if snapshot is None:
+                raise FileNotFoundError('Cannot list the contents of folder \'' + parent_dir + '\'')
 
         # (2) list children files that are singlefiles
-        content_files = [content_file for content_file in listdir(parent_dir)
-                         # -> we are in flat mode : should be a file not a folder :
-                         if isfile(join(parent_dir,content_file))
-                         # -> we are looking for children of a specific item :
-                         and content_file.startswith(base_prefix)
+        # -> we are in flat mode : should be a file not a folder (the snapshot file names only contain files)
+        # -> we are looking for children of a specific item : they should start with the prefix followed by the
+        # separator (or with nothing in case of the root folder). The snapshot finds them by bisection.
+        content_files = [content_file for content_file in snapshot.get_file_names_with_prefix(base_prefix + start_with)
                          # -> we are looking for multifile child items only :
-                         and content_file != base_prefix
-                         # -> they should start with the separator (or with nothing in case of the root folder) :
-                         and (content_file[len(base_prefix):]).startswith(start_with)
+                         if content_file != base_prefix
                          # -> they should have a valid extension :
                          and (content_file[len(base_prefix + start_with):]).count(EXT_SEPARATOR) >= 1
                          ]
@@ -697,15 +1428,18 @@ class FlatFileMappingConfiguration(FileMappingConfiguration):
         :return:
         """
         # (1) Find the base directory and base name
-        if isdir(location):  # special case: parent location is the root folder where all the files are.
+        if self._get_dir_snapshot(location) is not None:
+            # special case: parent location is the root folder where all the files are.
             return len(self.find_multifile_object_children(location)) == 0
         else:
             # TODO same comment than in find_multifile_object_children
-            if exists(location):
-                # location is a file without extension. We can accept that as being a multifile object without children
-                return True
-            else:
-                return False
+            parent_dir = dirname(location)
+            if parent_dir is '':
+                parent_dir = '.'
+            parent_snapshot = self._get_dir_snapshot(parent_dir)
+
+            # location is a file without extension. We can accept that as being a multifile object without children
+            return parent_snapshot is not None and parent_snapshot.has_file(basename(location))
 
     def get_multifile_object_child_location(self, parent_location: str, child_name: str):
         """
@@ -738,15 +1472,14 @@ class FlatFileMappingConfiguration(FileMappingConfiguration):
 
         # trick : is sep_for_flat is a dot, we have to take into account that there is also a dot for the extension
         min_sep_count = (1 if self.separator == EXT_SEPARATOR else 0)
-        possible_object_files = {object_file[len(base_prefix):]: join(parent_dir, object_file)
-                                 for object_file in listdir(parent_dir) if isfile(parent_dir + '/' + object_file)
-                                 and object_file.startswith(base_prefix)
-                                 # file must be named base_prefix.something
-                                 and object_file != base_prefix
-                                 and object_file[len(base_prefix)] == EXT_SEPARATOR
-                                 and (object_file[len(base_prefix):]).count(EXT_SEPARATOR) == 1
+        snapshot = self._get_dir_snapshot(parent_dir)
+        if snapshot is None:
+            raise FileNotFoundError('Cannot list the contents of folder \'' + parent_dir + '\'')
+        # file must be named base_prefix.something, with no other EXT_SEPARATOR in the something: use the stem index
+        possible_object_files = {ext: join(parent_dir, object_file)
+                                 for ext, object_file in snapshot.get_file_exts_for_stem(base_prefix).items()
                                  # and no other item separator should be present in the something
-                                 and (object_file[len(base_prefix):]).count(self.separator) == min_sep_count}
+                                 if ext.count(self.separator) == min_sep_count}
 
         return possible_object_files
 
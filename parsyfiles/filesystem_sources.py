@@ -0,0 +1,213 @@
+import tarfile
+import zipfile
+from io import TextIOWrapper, StringIO, BytesIO
+from os import sep
+from os.path import normpath
+from typing import Dict, List, Optional, Tuple, Union
+
+from parsyfiles.filesystem_mapping import FileSource, DirectorySnapshot, VirtualFilePath
+from parsyfiles.var_checker import check_var
+
+
+def _to_archive_path(path: str) -> str:
+    """
+    Returns the normalized posix path used as a key in folder indexes, where the root is ''
+
+    :param path:
+    :return:
+    """
+    path = normpath(path).replace(sep, '/')
+    return '' if path == '.' else path.lstrip('/')
+
+
+class _FolderIndex(object):
+    """
+    The folder structure of a tree of files, built once from the list of all file paths: for each folder path
+    (posix-style, '' for the root) the names of the files and subfolders it contains.
+    """
+
+    def __init__(self):
+        self._folders = {'': ([], set())}  # type: Dict[str, Tuple[List[str], set]]
+
+    def _add_folder(self, folder_path: str):
+        """ Registers a folder and all its ancestors """
+        if folder_path not in self._folders:
+            parent_path, _, folder_name = folder_path.rpartition('/')
+            self._add_folder(parent_path)
+            self._folders[parent_path][1].add(folder_name)
+            self._folders[folder_path] = ([], set())
+
+    def add_file(self, file_path: str):
+        """ Registers a file, and all its ancestor folders """
+        folder_path, _, file_name = _to_archive_path(file_path).rpartition('/')
+        self._add_folder(folder_path)
+        self._folders[folder_path][0].append(file_name)
+
+    def add_folder(self, folder_path: str):
+        """ Registers a (possibly empty) folder, and all its ancestor folders """
+        folder_path = _to_archive_path(folder_path)
+        if folder_path != '':
+            self._add_folder(folder_path)
+
+    def create_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Returns a DirectorySnapshot of the folder at dir_path, or None if there is no such folder
+
+        :param dir_path:
+        :return:
+        """
+        folder = self._folders.get(_to_archive_path(dir_path), None)
+        if folder is None:
+            return None
+        else:
+            return DirectorySnapshot(dir_path, folder[0], folder[1])
+
+
+class ArchiveFileSource(FileSource):
+    """
+    A FileSource reading files and folders directly from a zip or tar archive (possibly compressed), without
+    extracting it. The member list of the archive is read only once, when this object is created, and all paths are
+    relative to the root of the archive. For example:
+
+        parse_item('my_obj', MyType,
+                   file_mapping_conf=WrappedFileMappingConfiguration(file_source=ArchiveFileSource('data.zip')))
+
+    Parsers in streaming mode read the archive members directly. Parsers that need a file path receive a temporary
+    copy of the member.
+    """
+
+    def __init__(self, archive_path: str):
+        """
+        Opens the archive and indexes its members
+
+        :param archive_path: the path to a zip or tar archive. tar archives may be compressed with gzip, bz2 or lzma
+        """
+        check_var(archive_path, var_types=str, var_name='archive_path')
+        self.archive_path = archive_path
+        self._index = _FolderIndex()
+
+        if zipfile.is_zipfile(archive_path):
+            self._zip_file = zipfile.ZipFile(archive_path, 'r')
+            self._tar_file = None
+            for member in self._zip_file.infolist():
+                if member.filename.endswith('/'):
+                    self._index.add_folder(member.filename)
+                else:
+                    self._index.add_file(member.filename)
+
+        elif tarfile.is_tarfile(archive_path):
+            self._zip_file = None
+            self._tar_file = tarfile.open(archive_path, 'r:*')
+            self._tar_members = dict()
+            for member in self._tar_file.getmembers():
+                if member.isdir():
+                    self._index.add_folder(member.name)
+                elif member.isfile():
+                    self._index.add_file(member.name)
+                    self._tar_members[_to_archive_path(member.name)] = member
+
+        else:
+            raise ValueError('File ' + archive_path + ' is not a zip or tar archive')
+
+    def __str__(self):
+        return 'archive <' + self.archive_path + '>'
+
+    def close(self):
+        """
+        Closes the archive. The parsed objects remain available but no file can be read from this source anymore.
+
+        :return:
+        """
+        if self._zip_file is not None:
+            self._zip_file.close()
+        if self._tar_file is not None:
+            self._tar_file.close()
+
+    def create_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Implementation of the parent method: uses the index of archive members
+
+        :param dir_path:
+        :return:
+        """
+        return self._index.create_dir_snapshot(dir_path)
+
+    def get_singlefile_path(self, file_path: str) -> Union[str, VirtualFilePath]:
+        """
+        Implementation of the parent method: returns a VirtualFilePath able to open the archive member
+
+        :param file_path:
+        :return:
+        """
+        member_path = _to_archive_path(file_path)
+
+        def open_stream(binary: bool, encoding: str):
+            if self._zip_file is not None:
+                stream = self._zip_file.open(member_path, 'r')
+            else:
+                stream = self._tar_file.extractfile(self._tar_members[member_path])
+            return stream if binary else TextIOWrapper(stream, encoding=encoding)
+
+        return VirtualFilePath(file_path, open_stream)
+
+
+class InMemoryFileSource(FileSource):
+    """
+    A FileSource reading files and folders from a dictionary of file contents held in memory, so that object trees
+    can be parsed without any disk access. Keys are the file paths (posix-style, relative to the root of the tree) and
+    values are the file contents, either as str or as bytes. A key ending with '/' declares an (empty) folder. For
+    example:
+
+        files = {'data/item0/a.txt': 'hello', 'data/item1/a.txt': b'world'}
+        parse_collection('data', Dict[str, str],
+                         file_mapping_conf=WrappedFileMappingConfiguration(file_source=InMemoryFileSource(files)))
+
+    Parsers in streaming mode receive a StringIO view of the contents. Parsers that need a file path receive a
+    temporary copy of the file.
+    """
+
+    def __init__(self, files: Dict[str, Union[str, bytes]]):
+        """
+        Indexes the provided files. Files added to the dictionary after this call will not be visible.
+
+        :param files: a dictionary of {file path: contents}, where contents are str or bytes
+        """
+        check_var(files, var_types=dict, var_name='files')
+        self._index = _FolderIndex()
+        self._files = dict()
+        for file_path, contents in files.items():
+            if file_path.endswith('/'):
+                self._index.add_folder(file_path)
+            else:
+                check_var(contents, var_types=(str, bytes), var_name='contents of <' + file_path + '>')
+                self._index.add_file(file_path)
+                self._files[_to_archive_path(file_path)] = contents
+
+    def __str__(self):
+        return 'in-memory files'
+
+    def create_dir_snapshot(self, dir_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Implementation of the parent method: uses the index of in-memory files
+
+        :param dir_path:
+        :return:
+        """
+        return self._index.create_dir_snapshot(dir_path)
+
+    def get_singlefile_path(self, file_path: str) -> Union[str, VirtualFilePath]:
+        """
+        Implementation of the parent method: returns a VirtualFilePath opening in-memory views on the file contents
+
+        :param file_path:
+        :return:
+        """
+        contents = self._files[_to_archive_path(file_path)]
+
+        def open_stream(binary: bool, encoding: str):
+            if binary:
+                return BytesIO(contents if isinstance(contents, bytes) else contents.encode(encoding or 'utf-8'))
+            else:
+                return StringIO(contents if isinstance(contents, str) else contents.decode(encoding or 'utf-8'))
+
+        return VirtualFilePath(file_path, open_stream)
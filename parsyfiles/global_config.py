@@ -4,10 +4,13 @@ class GlobalConfig:
     """ The global configuration object used module-wide. Last-resort option to provide customizability
     (RootParser is preferred)"""
     def __init__(self, multiple_errors_tb_limit: int = 3, full_paths_in_logs: bool = False, 
-                 dict_to_object_subclass_limit: int = 50):
+                 dict_to_object_subclass_limit: int = 50, parsers_cache_size: int = 256,
+                 adaptive_cascades: bool = False):
         self.multiple_errors_tb_limit = multiple_errors_tb_limit
         self.full_paths_in_logs = full_paths_in_logs
         self.dict_to_object_subclass_limit = dict_to_object_subclass_limit
+        self.parsers_cache_size = parsers_cache_size
+        self.adaptive_cascades = adaptive_cascades
 
 
 GLOBAL_CONFIG = GlobalConfig()
@@ -15,7 +18,8 @@ GLOBAL_CONFIG = GlobalConfig()
 
 # TODO it would actually be much better to revise the exceptions object model to make all details available. This would almost remove the need for option multiple_errors_tb_limit
 def parsyfiles_global_config(multiple_errors_tb_limit: int = None, full_paths_in_logs: bool = None, 
-                             dict_to_object_subclass_limit: int = None):
+                             dict_to_object_subclass_limit: int = None, parsers_cache_size: int = None,
+                             adaptive_cascades: bool = None):
     """
     This is the method you should use to configure the parsyfiles library
 
@@ -25,6 +29,13 @@ def parsyfiles_global_config(multiple_errors_tb_limit: int = None, full_paths_in
     be displayed and children paths will be indented (default is False)
     :param dict_to_object_subclass_limit: the number of subclasses that the <dict_to_object> converter will try, when 
     instantiating an object from a dictionary. Default is 50
+    :param parsers_cache_size: the number of parsers built for a given type, extension and file kind that each parser
+    registry keeps in memory so that files of the same shape reuse them. This is also the number of parser queries
+    (desired type and extension) whose matching parsers are kept in memory. Default is 256, 0 disables the caches
+    :param adaptive_cascades: if True, when several parsers may parse a file, they will be tried in the order of their
+    observed success rates for the same desired type and file extension, instead of the default order. This avoids
+    repeating the same failed attempts for collections of files of the same shape, but it may change the parser used
+    when several of them would succeed. Default is False
     :return:
     """
     if multiple_errors_tb_limit is not None:
@@ -33,3 +44,7 @@ def parsyfiles_global_config(multiple_errors_tb_limit: int = None, full_paths_in
         GLOBAL_CONFIG.full_paths_in_logs = full_paths_in_logs
     if dict_to_object_subclass_limit is not None:
         GLOBAL_CONFIG.dict_to_object_subclass_limit = dict_to_object_subclass_limit
+    if parsers_cache_size is not None:
+        GLOBAL_CONFIG.parsers_cache_size = parsers_cache_size
+    if adaptive_cascades is not None:
+        GLOBAL_CONFIG.adaptive_cascades = adaptive_cascades
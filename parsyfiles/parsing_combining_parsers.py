@@ -1,5 +1,7 @@
+import threading
 import traceback
 from collections import Mapping, OrderedDict
+from contextlib import contextmanager
 from io import StringIO, TextIOBase
 from logging import Logger, DEBUG
 from typing import Type, Dict, Any, List, Iterable, Union, Tuple
@@ -18,6 +20,7 @@ class DelegatingParsingPlan(ParsingPlan[T]):
     """
     A wrapper for a parsing plan.
     """
+    __slots__ = ('pp',)
 
     # noinspection PyMissingConstructor
     def __init__(self, pp):
@@ -182,6 +185,114 @@ def short_exception_message(e):
         return str(e)
 
 
+# the maximum number of (desired type, file extension) for which each CascadeStats records the outcomes of the parsers
+CASCADE_STATS_SIZE = 256
+
+# held while the outcomes of the parsers are read or updated, in all CascadeStats (a module-level lock does not prevent
+# the registries owning them from being copied or pickled)
+_cascade_stats_lock = threading.Lock()
+
+# the CascadeStats of the registry currently creating a parsing plan in this thread, see using_cascade_stats
+_cascade_stats_locals = threading.local()
+
+
+class CascadeStats(object):
+    """
+    The outcomes of the parsers tried by the parsing cascades when adaptive cascades are enabled with
+    parsyfiles_global_config(adaptive_cascades=True). Each parser registry owns one, so that the files parsed with a
+    RootParser do not change the order of the cascades of another one (see ParserRegistry.get_cascade_stats).
+
+    Only the CASCADE_STATS_SIZE most recently used (desired type, file extension) are remembered. Outcomes are recorded
+    under a lock, so that none is lost when several threads parse with the same registry. The order of a cascade is
+    computed from the outcomes recorded when its plan is created and executed, so it may differ between threads.
+    """
+    def __init__(self):
+        # (desired type, file extension) > (type, parser) > [number of successes, number of failures]
+        self._stats = OrderedDict()
+
+    def get_all(self) -> Dict[Tuple[Type, str], Dict[Tuple[Type, Parser], Tuple[int, int]]]:
+        """
+        Returns a copy of the recorded outcomes. For each desired type and file extension, a dictionary gives the
+        number of successes and failures of each (type, parser) of the cascades.
+
+        :return:
+        """
+        with _cascade_stats_lock:
+            return {key: {entry: tuple(outcomes) for entry, outcomes in entries.items()}
+                    for key, entries in self._stats.items()}
+
+    def clear(self):
+        """
+        Forgets the recorded outcomes, so that the cascades go back to their default order.
+        """
+        with _cascade_stats_lock:
+            self._stats.clear()
+
+    def record(self, desired_type: Type, ext: str, typ: Type, parser: Parser, success: bool):
+        """
+        Records that the given parser of a cascade succeeded or failed to parse a file with extension ext into
+        desired_type
+
+        :param desired_type:
+        :param ext:
+        :param typ:
+        :param parser:
+        :param success:
+        :return:
+        """
+        key = (desired_type, ext)
+        with _cascade_stats_lock:
+            entries = self._stats.get(key)
+            if entries is None:
+                entries = self._stats[key] = dict()
+                while len(self._stats) > CASCADE_STATS_SIZE:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(key)
+            entries.setdefault((typ, parser), [0, 0])[0 if success else 1] += 1
+
+    def sort_by_success_rate(self, parser_list: List[Tuple[Type, Parser]], desired_type: Type, ext: str) \
+            -> List[Tuple[Type, Parser]]:
+        """
+        Returns a copy of parser_list sorted by decreasing success rate of each parser for desired_type and ext.
+        Parsers that were never tried have a rate of 1/2, and parsers with equal rates remain in their default order.
+
+        :param parser_list:
+        :param desired_type:
+        :param ext:
+        :return:
+        """
+        with _cascade_stats_lock:
+            stats = self._stats.get((desired_type, ext))
+            if not stats:
+                return parser_list
+            rates = {entry: (nb_success + 1) / (nb_success + nb_failure + 2)
+                     for entry, (nb_success, nb_failure) in stats.items()}
+
+        return sorted(parser_list, key=lambda entry: rates.get(entry, 0.5), reverse=True)
+
+
+@contextmanager
+def using_cascade_stats(stats: CascadeStats):
+    """
+    Context manager making the given stats the ones recorded and used by the cascading parsing plans created in this
+    thread, unless the stats of an outer registry are already in use. Used by the parser registries when they create
+    a parsing plan.
+
+    :param stats:
+    :return:
+    """
+    if getattr(_cascade_stats_locals, 'stats', None) is not None:
+        # the outermost registry wins (the multifile parsers may use another registry to find the children parsers)
+        yield
+    else:
+        _cascade_stats_locals.stats = stats
+        try:
+            yield
+        finally:
+            _cascade_stats_locals.stats = None
+
+
 class CascadingParser(DelegatingParser):
     """
     Represents a cascade of parsers that are tried in order: the first parser is used, then if it fails the second is
@@ -190,6 +301,10 @@ class CascadingParser(DelegatingParser):
 
     Finally note that this class can either be used to create a cascade of parsers for the same destination type, or
     for different destination types (for example in case of a Union)
+
+    If parsyfiles_global_config(adaptive_cascades=True) is set, the outcome of each parser is recorded in the
+    CascadeStats of the registry creating the parsing plan, and the parsers are tried in the order of their success
+    rates for the same desired type and file extension (see ParserRegistry.get_cascade_stats).
     """
     def __init__(self, parsers: Union[Iterable[AnyParser], Dict[Type, Iterable[AnyParser]]] = None):
         """
@@ -305,6 +420,7 @@ class CascadingParser(DelegatingParser):
         """
         A wrapper for the currently active parsing plan, simply to provide a different string representation.
         """
+        __slots__ = ('cascadeparser',)
         def __init__(self, pp, cascadeparser: 'CascadingParser'):
             # -- explicitly DONT use base constructor nor super
             DelegatingParsingPlan.__init__(self, pp)
@@ -318,6 +434,8 @@ class CascadingParser(DelegatingParser):
         Represents a parsing plan built by multiple parsers. It is at any time a proxy of the most appropriate parsing
         plan
         """
+        __slots__ = ('parser_list', 'active_parser_idx', 'active_parsing_plan', 'parsing_plan_creation_errors',
+                     'cascade_stats')
 
         def _execute(self, logger: Logger, options: Dict[str, Dict[str, Any]]) -> T:
             raise NotImplementedError('This method is not implemented directly but through inner parsing plans. '
@@ -334,12 +452,19 @@ class CascadingParser(DelegatingParser):
 
             # --parser list
             check_var(parser_list, var_types=list, var_name='parser_list', min_len=1)
+            # the stats of the registry creating this plan, if adaptive cascades are enabled
+            self.cascade_stats = getattr(_cascade_stats_locals, 'stats', None) if GLOBAL_CONFIG.adaptive_cascades \
+                else None
+            if self.cascade_stats is not None:
+                # try the parsers that succeeded most for the same kind of files first
+                parser_list = self.cascade_stats.sort_by_success_rate(parser_list, desired_type, obj_on_filesystem.ext)
             self.parser_list = parser_list
 
             # -- the variables that will contain the active parser and its parsing plan
             self.active_parser_idx = -1
             self.active_parsing_plan = None
-            self.parsing_plan_creation_errors = OrderedDict()
+            # created on first error only, since most plans do not have any
+            self.parsing_plan_creation_errors = None
 
             # -- activate the next one
             self.activate_next_working_parser(logger=logger)
@@ -359,6 +484,10 @@ class CascadingParser(DelegatingParser):
                 # ask each parser to create a parsing plan right here. Stop at the first working one
                 for i in range(self.active_parser_idx+1, len(self.parser_list)):
                     typ, p = self.parser_list[i]
+                    if self.parsing_plan_creation_errors is not None \
+                            and (typ or self.obj_type, p) in self.parsing_plan_creation_errors:
+                        # already failed to create a parsing plan, before the parsers were sorted again (see execute)
+                        continue
                     # if i > 0:
                     #     # print('----- Rebuilding local parsing plan with next candidate parser:')
                     #     if logger is not None:
@@ -404,13 +533,28 @@ class CascadingParser(DelegatingParser):
                             # print(msg.getvalue())
                             # (Note: we dont use warning because it does not show up in the correct order in the console)
 
+                        if self.cascade_stats is not None:
+                            self.cascade_stats.record(self.obj_type, self.obj_on_fs_to_parse.ext, typ, p, success=False)
+
                         # -- remember the error in order to create a CascadeError at the end in case of failure of all
+                        if self.parsing_plan_creation_errors is None:
+                            self.parsing_plan_creation_errors = OrderedDict()
                         self.parsing_plan_creation_errors[(typ or self.obj_type, p)] = err
 
             # no more parsers to try...
             raise CascadeError(self.parser, self, self.parsing_plan_creation_errors,
                                already_caught_execution_errors) from None
 
+        def _record_active_parser_outcome(self, success: bool):
+            """
+            Records the outcome of the currently active parser in the cascade statistics
+
+            :param success:
+            :return:
+            """
+            typ, p = self.parser_list[self.active_parser_idx]
+            self.cascade_stats.record(self.obj_type, self.obj_on_fs_to_parse.ext, typ, p, success=success)
+
         def execute(self, logger: Logger, options: Dict[str, Dict[str, Any]]):
             """
             Delegates execution to currently active parser. In case of an exception, recompute the parsing plan and
@@ -420,14 +564,36 @@ class CascadingParser(DelegatingParser):
             :param options:
             :return:
             """
+            if self.active_parsing_plan is not None and self.cascade_stats is not None:
+                # the plans of a whole collection are created before executing any of them: take into account the
+                # outcomes observed since this plan was created
+                parser_list = self.cascade_stats.sort_by_success_rate(self.parser_list, self.obj_type,
+                                                                      self.obj_on_fs_to_parse.ext)
+                if parser_list != self.parser_list:
+                    active_entry = self.parser_list[self.active_parser_idx]
+                    self.parser_list = parser_list
+                    if parser_list[0] == active_entry:
+                        # the active parser is still the first one: keep its plan
+                        self.active_parser_idx = 0
+                    else:
+                        # the parsers that already failed to create a plan are not tried nor recorded again
+                        self.active_parser_idx = -1
+                        self.activate_next_working_parser(logger=logger)
+
             if self.active_parsing_plan is not None:
                 execution_errors = OrderedDict()
                 while self.active_parsing_plan is not None:
                     try:
                         # -- try to execute current plan
-                        return self.active_parsing_plan.execute(logger, options)
+                        res = self.active_parsing_plan.execute(logger, options)
+                        if self.cascade_stats is not None:
+                            self._record_active_parser_outcome(success=True)
+                        return res
 
                     except Exception as err:
+                        if self.cascade_stats is not None:
+                            self._record_active_parser_outcome(success=False)
+
                         # -- log the error
                         if not logger.isEnabledFor(DEBUG):
                             logger.warning('ERROR while parsing [{location}] into a [{type}] using [{parser}]. '
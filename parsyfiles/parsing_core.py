@@ -6,7 +6,8 @@ from typing import Union, Type, Callable, Dict, Any, Set
 
 from parsyfiles import GLOBAL_CONFIG
 from parsyfiles.converting_core import get_options_for_id
-from parsyfiles.filesystem_mapping import MULTIFILE_EXT, PersistedObject
+from parsyfiles.filesystem_mapping import MULTIFILE_EXT, PersistedObject, open_singlefile, singlefile_on_disk, \
+    singlefile_buffer
 from parsyfiles.parsing_core_api import Parser, T, ParsingPlan, get_parsing_plan_log_str
 from parsyfiles.type_inspection_tools import get_pretty_type_str
 from parsyfiles.var_checker import check_var
@@ -91,6 +92,7 @@ class _BaseParsingPlan(ParsingPlan[T]):
     * relies on the singlefile and multifile parsing methods of _BaseParser to implement the inner _execute() method.
     * defines the _get_children_parsing_plan method that should be implemented by multifile parsers
     """
+    __slots__ = ('logger',)
 
     def __init__(self, object_type: Type[T], obj_on_filesystem: PersistedObject, parser: _BaseParser,
                  logger: Logger, accept_union_types: bool = False):
@@ -216,6 +218,7 @@ class AnyParser(_BaseParser):
         children. This enables to then implement the parent '_get_children_parsing_plan' method by just getting the
         stored field.
         """
+        __slots__ = ('_children_parsing_plan',)
 
         def __init__(self, object_type: Type[T], obj_on_filesystem: PersistedObject, parser: _BaseParser,
                      logger: Logger, accept_union_types: bool = False):
@@ -450,6 +453,14 @@ parsing_method_stream_example_signature_str = 'def my_parse_fun(desired_type: Ty
 parsing_method_file_example_signature_str = 'def my_parse_fun(desired_type: Type[T], path: str, encoding: str, ' \
                                             'logger: Logger, **kwargs) -> T'
 
+# the kind of stream provided to parsing functions in streaming mode
+STREAM_TEXT = 'text'
+""" A text stream, decoded with the file encoding (default) """
+STREAM_BINARY = 'binary'
+""" A binary stream, not decoded """
+STREAM_BUFFER = 'buffer'
+""" A read-only bytes-like object with the whole file contents. Files on the local filesystem are memory-mapped. """
+
 
 class CaughtTypeError(Exception):
     """
@@ -496,14 +507,17 @@ class SingleFileParserFunction(SingleFileParser): #metaclass=ABCMeta
 
     Two kind of parser_function may be provided as implementations:
     * if streaming_mode=True (default), this class handles opening and closing the file, and parser_function should
-    have a signature such as my_func(desired_type: Type[T], opened_file: TextIOBase, logger: Logger, **kwargs) -> T
+    have a signature such as my_func(desired_type: Type[T], opened_file: TextIOBase, logger: Logger, **kwargs) -> T.
+    Binary formats may set stream_type=STREAM_BINARY to receive a binary stream instead, or stream_type=STREAM_BUFFER
+    to receive a read-only bytes-like object (memory-mapped for local files) with the whole file contents.
     * if streaming_mode=False, this class does not handle opening and closing the file. parser_function should be a
     my_func(desired_type: Type[T], file_path: str, encoding: str, logger: Logger, **kwargs) -> T
     """
 
     def __init__(self, parser_function: Union[ParsingMethodForStream, ParsingMethodForFile],
                  supported_types: Set[Type[T]], supported_exts: Set[str], streaming_mode: bool = True,
-                 custom_name: str = None, function_args: dict = None, option_hints: Callable[[], str] = None):
+                 custom_name: str = None, function_args: dict = None, option_hints: Callable[[], str] = None,
+                 stream_type: str = STREAM_TEXT):
         """
         Constructor from a parser function , a mandatory set of supported types, and a mandatory set of supported
         extensions.
@@ -521,6 +535,11 @@ class SingleFileParserFunction(SingleFileParser): #metaclass=ABCMeta
         :param supported_exts: mandatory set of supported singlefile extensions ('.txt', '.json' ...)
         :param function_args: kwargs that will be passed to the function at every call
         :param option_hints: an optional method returning a string containing the options descriptions
+        :param stream_type: the kind of stream provided to the function in streaming mode: STREAM_TEXT (default) for
+        a text stream decoded with the file encoding, STREAM_BINARY for a binary stream, or STREAM_BUFFER for a
+        read-only bytes-like object with the whole file contents. In STREAM_BUFFER mode, local files are memory-mapped
+        and the mapping is closed as soon as the function returns, so the function should not keep references to it
+        (use bytes(buffer[a:b]) to keep a copy of a part of it).
         """
         super(SingleFileParserFunction, self).__init__(supported_types=supported_types, supported_exts=supported_exts)
 
@@ -536,6 +555,11 @@ class SingleFileParserFunction(SingleFileParser): #metaclass=ABCMeta
         # -- check the streaming mode
         check_var(streaming_mode, var_types=bool, var_name='streaming_mode')
         self._streaming_mode = streaming_mode
+        check_var(stream_type, var_types=str, var_name='stream_type',
+                  allowed_values={STREAM_TEXT, STREAM_BINARY, STREAM_BUFFER})
+        if not streaming_mode and stream_type != STREAM_TEXT:
+            raise ValueError('stream_type can only be set when streaming_mode is True')
+        self._stream_type = stream_type
 
         # -- remember the static args values
         check_var(function_args, var_types=dict, var_name='function_args', enforce_not_none=False)
@@ -575,7 +599,7 @@ class SingleFileParserFunction(SingleFileParser): #metaclass=ABCMeta
         """
         Relies on the inner parsing function to parse the file.
         If _streaming_mode is True, the file will be opened and closed by this method. Otherwise the parsing function
-        will be responsible to open and close.
+        will be responsible to open and close, and receives the path of a regular file on the local filesystem.
 
         :param desired_type:
         :param file_path:
@@ -588,19 +612,17 @@ class SingleFileParserFunction(SingleFileParser): #metaclass=ABCMeta
         if self._streaming_mode:
 
             # We open the stream, and let the function parse from it
+            if self._stream_type == STREAM_BUFFER:
+                with singlefile_buffer(file_path) as file_buffer:
+                    return self._call_parser_func(desired_type, file_buffer, logger, opts)
+
             file_stream = None
             try:
-                # Open the file with the appropriate encoding
-                file_stream = open(file_path, 'r', encoding=encoding)
+                # Open the file with the appropriate encoding, or in binary mode
+                file_stream = open_singlefile(file_path, encoding, binary=(self._stream_type == STREAM_BINARY))
 
                 # Apply the parsing function
-                if self.function_args is None:
-                    return self._parser_func(desired_type, file_stream, logger, **opts)
-                else:
-                    return self._parser_func(desired_type, file_stream, logger, **self.function_args, **opts)
-
-            except TypeError as e:
-                raise CaughtTypeError.create(self._parser_func, e)
+                return self._call_parser_func(desired_type, file_stream, logger, opts)
 
             finally:
                 if file_stream is not None:
@@ -608,8 +630,30 @@ class SingleFileParserFunction(SingleFileParser): #metaclass=ABCMeta
                     file_stream.close()
 
         else:
-            # the parsing function will open the file itself
+            # the parsing function will open the file itself. Files that are not on the local filesystem (for example
+            # archive members) are copied to a temporary file first
+            with singlefile_on_disk(file_path) as local_file_path:
+                if self.function_args is None:
+                    return self._parser_func(desired_type, local_file_path, encoding, logger, **opts)
+                else:
+                    return self._parser_func(desired_type, local_file_path, encoding, logger, **self.function_args,
+                                             **opts)
+
+    def _call_parser_func(self, desired_type: Type[T], file_stream, logger: Logger, opts: Dict[str, Any]) -> T:
+        """
+        Applies the parsing function in streaming mode
+
+        :param desired_type:
+        :param file_stream: the open stream or buffer
+        :param logger:
+        :param opts: the options for this parser
+        :return:
+        """
+        try:
             if self.function_args is None:
-                return self._parser_func(desired_type, file_path, encoding, logger, **opts)
+                return self._parser_func(desired_type, file_stream, logger, **opts)
             else:
-                return self._parser_func(desired_type, file_path, encoding, logger, **self.function_args, **opts)
+                return self._parser_func(desired_type, file_stream, logger, **self.function_args, **opts)
+
+        except TypeError as e:
+            raise CaughtTypeError.create(self._parser_func, e)
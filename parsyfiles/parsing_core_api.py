@@ -40,7 +40,7 @@ def check_extension(extension: str, allow_multifile: bool = False):
 
     # Extension should either be 'multifile' or start with EXT_SEPARATOR and contain only one EXT_SEPARATOR
     if (extension.startswith(EXT_SEPARATOR) and extension.count(EXT_SEPARATOR) == 1) \
-            or (allow_multifile and extension is MULTIFILE_EXT):
+            or (allow_multifile and extension == MULTIFILE_EXT):
         # ok
         pass
     else:
@@ -318,7 +318,11 @@ class ParsingPlan(Generic[T], PersistedObject):
     ParsingPlan instances should not be created directly by users, but through implementations of Parser class.
 
     This class can be typed with PEP484 (e.g. ParsingPlan[int], etc.)
+
+    Like PersistedObject, this class and its subclasses declare __slots__ to save memory. The slots of PersistedObject
+    are left empty: accessing them falls back to __getattr__ and therefore to the inner PersistedObject.
     """
+    __slots__ = ('obj_type', 'obj_on_fs_to_parse', 'parser')
 
     def __init__(self, object_type: Type[T], obj_on_filesystem: PersistedObject,
                  parser: _BaseParserDeclarationForRegistries, accept_union_types: bool = False):
@@ -1,16 +1,24 @@
+import pickle
 import traceback
+from hashlib import sha1
+from importlib.util import find_spec
 from io import StringIO
 from logging import getLogger, Logger
+from os import walk, stat, replace, remove
+from os.path import dirname, join, relpath, abspath, basename
+from platform import python_version
+from tempfile import mkstemp
 from typing import Type, Dict, Any, Set, Tuple, List
 from warnings import warn
 
 from copy import deepcopy
 
 from parsyfiles.log_utils import default_logger
-from parsyfiles.converting_core import JOKER
+from parsyfiles.converting_core import JOKER, Converter, S
 from parsyfiles.filesystem_mapping import FileMappingConfiguration, WrappedFileMappingConfiguration
+from parsyfiles.parsing_combining_parsers import CascadeStats
 from parsyfiles.parsing_core_api import T, Parser
-from parsyfiles.parsing_registries import ParserRegistryWithConverters
+from parsyfiles.parsing_registries import ParserRegistryWithConverters, LazyPlugin, _lazy_plugins_lock
 from parsyfiles.plugins_base.support_for_collections import MultifileCollectionParser
 from parsyfiles.plugins_base.support_for_objects import MultifileObjectParser
 from parsyfiles.type_inspection_tools import get_pretty_type_str
@@ -74,7 +82,19 @@ def add_parser_options(options: Dict[str, Dict[str, Any]], parser_id: str, parse
 
 def register_default_plugins(root_parser: ParserRegistryWithConverters):
     """
-    Utility method to register all default plugins on the given parser+converter registry
+    Utility method to register all default plugins on the given parser+converter registry, in a single registration
+    batch
+
+    :param root_parser:
+    :return:
+    """
+    with root_parser.registration_batch():
+        _register_default_plugins(root_parser)
+
+
+def _register_default_plugins(root_parser: ParserRegistryWithConverters):
+    """
+    Registers all default plugins on the given parser+converter registry, see register_default_plugins
 
     :param root_parser:
     :return:
@@ -128,15 +148,43 @@ def register_default_plugins(root_parser: ParserRegistryWithConverters):
         # root_parser.register_converters()
     except ImportError as e:
         warn_import_error('yaml', e)
+
+    # -- numpy and pandas are long to import: they are only loaded when needed, see LazyPlugin. Note that the pandas
+    # plugin is loaded when a .txt file is parsed into a dict or into any type that may be built from a dict (most
+    # custom objects), since its csv parser may lead to it.
+    root_parser.register_lazy_plugin(LazyPlugin('numpy', _register_numpy_plugin, supported_exts=set(),
+                                                supported_modules={'numpy'}))
+    root_parser.register_lazy_plugin(LazyPlugin('pandas', _register_pandas_plugin,
+                                                supported_exts={'.csv', '.xls', '.xlsx', '.xlsm'},
+                                                supported_modules={'pandas'},
+                                                shared_exts={'.txt'}, shared_exts_types={dict}))
+
+
+def _register_numpy_plugin(root_parser: ParserRegistryWithConverters):
+    """
+    Registers the numpy plugin on the given parser+converter registry. Declared as a lazy plugin in
+    _register_default_plugins
+
+    :param root_parser:
+    :return:
+    """
     try:
-        # -- numpy
         from parsyfiles.plugins_optional.support_for_numpy import get_default_np_parsers, get_default_np_converters
         root_parser.register_parsers(get_default_np_parsers())
         root_parser.register_converters(get_default_np_converters())
     except ImportError as e:
         warn_import_error('numpy', e)
+
+
+def _register_pandas_plugin(root_parser: ParserRegistryWithConverters):
+    """
+    Registers the pandas plugin on the given parser+converter registry. Declared as a lazy plugin in
+    _register_default_plugins
+
+    :param root_parser:
+    :return:
+    """
     try:
-        # -- pandas
         from parsyfiles.plugins_optional.support_for_pandas import get_default_pandas_parsers, \
             get_default_pandas_converters
         root_parser.register_parsers(get_default_pandas_parsers())
@@ -181,6 +229,17 @@ class RootParser(ParserRegistryWithConverters):
             d['logger'] = getLogger(d['logger'])
         self.__dict__.update(d)
 
+    def __deepcopy__(self, memo):
+        """ Deep copies are independent: references to the default instance whose registry is shared become
+        references to the copy, as in _copy_registry_on_write """
+        newone = object.__new__(type(self))
+        memo[id(self)] = newone
+        if self._registry_owner is not None:
+            memo[id(self._registry_owner)] = newone
+        newone.__setstate__(deepcopy(self.__getstate__(), memo))
+        newone._registry_owner = None
+        return newone
+
     def __init__(self, pretty_name: str = None, *, strict_matching: bool = False,
                  register_default_parsers: bool = True, logger: Logger = default_logger):
         """
@@ -196,6 +255,9 @@ class RootParser(ParserRegistryWithConverters):
             # otherwise this has already been done in __new__
             super(RootParser, self).__init__(pretty_name or 'parsyfiles defaults', strict_matching)
 
+            # this parser owns its registry (see DefaultRootParser.get_singleton_copy)
+            self._registry_owner = None
+
         # remember if the user registers the default parsers - for future calls to install_basic_multifile_support()
         self.multifile_installed = register_default_parsers
         self.default_parsers_installed = register_default_parsers
@@ -210,6 +272,85 @@ class RootParser(ParserRegistryWithConverters):
         check_var(logger, var_types=Logger, var_name='logger')
         self.logger = logger
 
+    def _copy_registry_on_write(self):
+        """
+        If this parser still shares the registry of the default instance (see DefaultRootParser.get_singleton_copy),
+        replaces it with a deep copy, where all references to the default instance (for example the 'finder' of the
+        multifile parsers) are replaced with references to this parser. Called before any registration.
+
+        :return:
+        """
+        owner = self._registry_owner
+        if owner is not None:
+            # do not copy the shared registry while it is being replaced, see _load_lazy_plugins
+            with _lazy_plugins_lock:
+                self._registry_owner = None
+                self.__setstate__(deepcopy(self.__getstate__(), {id(owner): self, id(self): self}))
+
+    def register_parser(self, parser: Parser):
+        """
+        Overrides the parent method to stop sharing the registry of the default instance first
+
+        :param parser:
+        :return:
+        """
+        self._copy_registry_on_write()
+        super(RootParser, self).register_parser(parser)
+
+    def register_converter(self, converter: Converter[S, T]):
+        """
+        Overrides the parent method to stop sharing the registry of the default instance first
+
+        :param converter:
+        :return:
+        """
+        self._copy_registry_on_write()
+        super(RootParser, self).register_converter(converter)
+
+    def register_lazy_plugin(self, plugin: LazyPlugin):
+        """
+        Overrides the parent method to stop sharing the registry of the default instance first
+
+        :param plugin:
+        :return:
+        """
+        self._copy_registry_on_write()
+        super(RootParser, self).register_lazy_plugin(plugin)
+
+    def _load_lazy_plugins(self, nb_to_load: int):
+        """
+        Overrides the parent method so that a parser still sharing the registry of the default instance does not modify
+        it, since other copies may be using it concurrently. The plugins are loaded in a deep copy of the default
+        instance instead, that replaces it as the default instance (so that next copies do not load them again), and
+        whose registry is then shared by this parser. If the default instance has already been replaced by one where
+        these plugins are loaded, its registry is simply shared.
+
+        :param nb_to_load:
+        :return:
+        """
+        with _lazy_plugins_lock:
+            owner = self._registry_owner
+            if owner is None:
+                super(RootParser, self)._load_lazy_plugins(nb_to_load)
+                return
+
+            needed = [plugin.name for plugin in self._lazy_plugins[0:nb_to_load]]
+            remaining = [plugin.name for plugin in self._lazy_plugins[nb_to_load:]]
+            current = DefaultRootParser._instance
+            current_remaining = [plugin.name for plugin in current._lazy_plugins]
+            if current is owner or not (set(needed).isdisjoint(current_remaining)
+                                        and remaining[len(remaining) - len(current_remaining):] == current_remaining):
+                # load the plugins in a new default instance
+                current = deepcopy(owner)
+                current._load_lazy_plugins(nb_to_load)
+                if DefaultRootParser._instance is owner:
+                    DefaultRootParser._instance = current
+
+            # share the registry of the new default instance, but keep what is specific to this parser
+            logger, cascade_stats = self.logger, self._cascade_stats
+            self.__dict__.update(current.__dict__)
+            self.logger, self._cascade_stats, self._registry_owner = logger, cascade_stats, current
+
     def install_basic_multifile_support(self):
         """
         Utility method for users who created a RootParser with register_default_plugins=False, in order to register only
@@ -318,7 +459,10 @@ class DefaultRootParser(RootParser):
     @staticmethod
     def get_singleton_copy():
         """
-        Returns a copy of the singleton. This is faster than registering all parsers again
+        Returns a copy of the singleton. This is faster than registering all parsers again: the copy shares the
+        registry of the singleton (and its caches) until a parser or a converter is registered on it. At that time the
+        registry is deep-copied (copy-on-write). The shared registry is never modified, lazy plugins are loaded in a
+        new singleton (see RootParser._load_lazy_plugins).
         :return:
         """
         return DefaultRootParser.__new__(DefaultRootParser, this_is_an_explicit_call=True)
@@ -336,9 +480,16 @@ class DefaultRootParser(RootParser):
                 # save it
                 DefaultRootParser._instance = inst
 
-            # create a DEEP copy of the default instance otherwise the parsers/converters that use this object as the
-            # 'finder' will get stuck on the previous one !
-            return deepcopy(DefaultRootParser._instance)
+            # create a shallow copy of the default instance. It has to be replaced with a DEEP copy before anything is
+            # registered, otherwise the parsers/converters that use this object as the 'finder' would get stuck on the
+            # default instance and miss the new registrations ! This is done in _copy_registry_on_write.
+            default_instance = DefaultRootParser._instance
+            c = super(DefaultRootParser, cls).__new__(cls)
+            c.__dict__.update(default_instance.__dict__)
+            c._registry_owner = default_instance
+            # the outcomes of the cascades are not part of the registry: each copy records its own
+            c._cascade_stats = CascadeStats()
+            return c
 
     def __copy__(self):
         # be sure not to use the default instance here: pass the 'explicit' argument
@@ -351,11 +502,182 @@ class DefaultRootParser(RootParser):
             # this is the first instance creation
             super(DefaultRootParser, self).__init__(register_default_parsers=False)
             register_default_plugins(self)
+
+            # conversion chains are found lazily: find them all once here so that all copies inherit them
+            self.get_all_conversion_chains()
         else:
             # this object is already a copy of it
             pass
 
 
+class ParserSnapshotMismatch(Exception):
+    """
+    Raised whenever a parser snapshot can not be loaded because it was saved with other versions of parsyfiles, of
+    python or of the optional plugins' dependencies
+    """
+    def __init__(self, contents):
+        """
+        We actually can't put more than 1 argument in the constructor, it creates a bug in Nose tests
+        https://github.com/nose-devs/nose/issues/725
+        That's why we have a helper static method create()
+
+        :param contents:
+        """
+        super(ParserSnapshotMismatch, self).__init__(contents)
+
+    @staticmethod
+    def create(snapshot_file: str, saved_versions: Dict[str, Any], current_versions: Dict[str, Any]):
+        """
+        Helper method provided because we actually can't put that in the constructor, it creates a bug in Nose tests
+        https://github.com/nose-devs/nose/issues/725
+
+        :param snapshot_file:
+        :param saved_versions:
+        :param current_versions:
+        :return:
+        """
+        diffs = sorted(name for name in set(saved_versions.keys()) | set(current_versions.keys())
+                       if saved_versions.get(name, None) != current_versions.get(name, None))
+        return ParserSnapshotMismatch('Parser snapshot [' + snapshot_file + '] can not be used, it was saved with '
+                                      'other versions of: ' + str(diffs))
+
+
+# version of the snapshot file format
+PARSER_SNAPSHOT_FORMAT_VERSION = 1
+
+# the optional dependencies of the default plugins, see _register_default_plugins
+_PLUGINS_DEPENDENCIES = ('jprops', 'yaml', 'numpy', 'pandas', 'attr')
+
+
+def _get_plugins_versions() -> Dict[str, Any]:
+    """
+    Returns a dictionary identifying the versions of everything a parser snapshot depends on: python, each optional
+    plugin dependency (None if it is not installed) and parsyfiles itself. The dependencies are not imported, since
+    the lazy plugins may not need them: they are identified by the location, size and modification time of their
+    main file. Since parsyfiles has no runtime version number, it is identified by the size and modification time of
+    its source files.
+
+    :return:
+    """
+    versions = dict()
+    versions['python'] = python_version()
+    for module_name in _PLUGINS_DEPENDENCIES:
+        spec = find_spec(module_name)
+        if spec is None or spec.origin is None:
+            versions[module_name] = None
+        else:
+            st = stat(spec.origin)
+            versions[module_name] = (spec.origin, st.st_size, st.st_mtime_ns)
+
+    package_dir = dirname(__file__)
+    sources = []
+    for folder, _, file_names in walk(package_dir):
+        for file_name in file_names:
+            if file_name.endswith('.py'):
+                st = stat(join(folder, file_name))
+                sources.append((relpath(join(folder, file_name), package_dir), st.st_size, st.st_mtime_ns))
+    versions['parsyfiles'] = sha1(repr(sorted(sources)).encode('utf-8')).hexdigest()
+    return versions
+
+
+def save_parser_snapshot(root_parser: RootParser, snapshot_file: str):
+    """
+    Saves a fully built root parser (parsers, converters, conversion chains and indexes) to a snapshot file, so that
+    it can be loaded with load_parser_snapshot instead of being built again, even in another process. The snapshot is
+    a pickle file: all parsers and converters must be picklable, and it should only be loaded if trusted.
+
+    :param root_parser: the root parser to save
+    :param snapshot_file: path of the snapshot file. It is first written to a temporary file and then moved, so that
+    concurrent readers never see a partial snapshot
+    :return:
+    """
+    check_var(root_parser, var_types=RootParser, var_name='root_parser')
+    check_var(snapshot_file, var_types=str, var_name='snapshot_file')
+
+    # an independent copy, without the parsers and conversion chains found for the types queried in this process
+    # (they may not be importable in others). Only the conversion chains between registered types are kept.
+    root_parser = deepcopy(root_parser)
+    root_parser._clear_caches()
+    root_parser._conversion_chains_queries.clear()
+    root_parser.get_all_conversion_chains()
+
+    # a unique temporary file, so that processes saving the same snapshot at the same time do not interleave
+    tmp_fd, tmp_file = mkstemp(dir=dirname(abspath(snapshot_file)), prefix=basename(snapshot_file) + '.',
+                               suffix='.tmp')
+    try:
+        with open(tmp_fd, 'wb') as f:
+            # the header is loaded first, so that nothing else is unpickled if the versions do not match
+            pickle.dump((PARSER_SNAPSHOT_FORMAT_VERSION, _get_plugins_versions()), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(root_parser, f, protocol=pickle.HIGHEST_PROTOCOL)
+        replace(tmp_file, snapshot_file)
+    except BaseException:
+        remove(tmp_file)
+        raise
+
+
+def load_parser_snapshot(snapshot_file: str) -> RootParser:
+    """
+    Loads a root parser saved with save_parser_snapshot.
+
+    :param snapshot_file: path of the snapshot file
+    :return: the root parser
+    :raises ParserSnapshotMismatch: if the snapshot was saved with other versions of parsyfiles, of python or of the
+    optional plugins' dependencies
+    """
+    check_var(snapshot_file, var_types=str, var_name='snapshot_file')
+    with open(snapshot_file, 'rb') as f:
+        header = pickle.load(f)
+        current_versions = _get_plugins_versions()
+        if not isinstance(header, tuple) or len(header) != 2 or not isinstance(header[1], dict):
+            raise ParserSnapshotMismatch('Parser snapshot [' + snapshot_file + '] can not be used, it does not start '
+                                         'with a valid header')
+        format_version, saved_versions = header
+        if format_version != PARSER_SNAPSHOT_FORMAT_VERSION or saved_versions != current_versions:
+            raise ParserSnapshotMismatch.create(snapshot_file, saved_versions, current_versions)
+        return pickle.load(f)
+
+
+def use_default_parser_snapshot(snapshot_file: str, logger: Logger = default_logger) -> bool:
+    """
+    Makes the default parser (used by RootParser(), parse_item and parse_collection) load from the given snapshot file
+    instead of registering all default plugins again. If the snapshot file does not exist or does not match the
+    current versions, the default parser is built as usual and saved to the snapshot file for next time. This is
+    typically useful for short-lived processes, and should be called before the default parser is first used.
+
+    :param snapshot_file: path of the snapshot file
+    :param logger:
+    :return: True if the default parser was loaded from the snapshot, False if it was built
+    """
+    if DefaultRootParser._instance is not None:
+        logger.warning('The default parser has already been created, the snapshot [{f}] is not used'
+                       ''.format(f=snapshot_file))
+        return False
+
+    try:
+        default_instance = load_parser_snapshot(snapshot_file)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # the snapshot is only a cache: whatever the reason why it can not be loaded, build the default parser
+        logger.info('Parser snapshot [{f}] can not be used, building the default parser. Caught {t}: {e}'
+                    ''.format(f=snapshot_file, t=type(e).__name__, e=e))
+    else:
+        if isinstance(default_instance, DefaultRootParser):
+            DefaultRootParser._instance = default_instance
+            return True
+
+    # build the default parser and save it
+    DefaultRootParser.get_singleton_copy()
+    try:
+        save_parser_snapshot(DefaultRootParser._instance, snapshot_file)
+    except Exception as e:
+        # the snapshot is only a cache: the default parser can still be used
+        logger.warning('Could not save the parser snapshot to [{f}]. Caught {t}: {e}'
+                       ''.format(f=snapshot_file, t=type(e).__name__, e=e))
+    return False
+
+
 # _default_rp = None
 
 
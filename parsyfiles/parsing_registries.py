@@ -1,9 +1,12 @@
 from abc import ABCMeta, abstractmethod
 from collections import OrderedDict
+from contextlib import contextmanager
 from io import StringIO
 from logging import Logger
 from pprint import pprint
-from typing import Type, Dict, Any, List, Set, Tuple, Union, Mapping, AbstractSet, Sequence, Iterable
+from threading import RLock
+from typing import Type, Dict, Any, List, Set, Tuple, Union, Mapping, AbstractSet, Sequence, Iterable, Optional, \
+    Callable
 from warnings import warn
 
 from parsyfiles import GLOBAL_CONFIG
@@ -11,12 +14,12 @@ from parsyfiles.converting_core import S, Converter, ConversionChain, is_any_typ
     ConversionException
 from parsyfiles.filesystem_mapping import PersistedObject
 from parsyfiles.parsing_combining_parsers import ParsingChain, CascadingParser, DelegatingParser, \
-    print_error_to_io_stream
+    print_error_to_io_stream, CascadeStats, using_cascade_stats
 from parsyfiles.parsing_core import _InvalidParserException
 from parsyfiles.parsing_core_api import Parser, ParsingPlan, T
 from parsyfiles.type_inspection_tools import get_pretty_type_str, get_base_generic_type, get_pretty_type_keys_dict, \
     robust_isinstance, is_collection, _extract_collection_base_type, is_typed_collection, \
-    get_alternate_types_resolving_forwardref_union_and_typevar, get_all_subclasses
+    get_alternate_types_resolving_forwardref_union_and_typevar, get_all_subclasses, _get_subclasses_tree
 from parsyfiles.var_checker import check_var
 
 
@@ -456,9 +459,11 @@ class ParserCache(AbstractParserCache):
         self._specific_parsers = list()
         self._generic_parsers = list()
 
-        # new attempt: simply store the list of supported types and exts
-        self._strict_types_to_ext = dict()
-        self._ext_to_strict_types = dict()
+        # inverted indexes: ext > positions of the parsers supporting it, in registration order. The same for the
+        # strict types supported by specific parsers.
+        self._generic_parsers_by_ext = dict()
+        self._specific_parsers_by_ext = dict()
+        self._specific_parsers_by_type = dict()
 
     def register_parser(self, parser: Parser):
         """
@@ -477,17 +482,19 @@ class ParserCache(AbstractParserCache):
             raise ValueError('Parser ' + str(parser) + ' can not be registered since it does not handle the JOKER cases '
                              'correctly')
 
-        # (1) store in the main lists
+        # (1) store in the main lists, and (2) in the inverted indexes
         if parser.is_generic():
+            position = len(self._generic_parsers)
             self._generic_parsers.append(parser)
+            for ext in parser.supported_exts:
+                insert_element_to_dict_of_list(self._generic_parsers_by_ext, ext, position)
         else:
+            position = len(self._specific_parsers)
             self._specific_parsers.append(parser)
-
-        # (2) simpler : simply store the ext <> type maps
-        for ext in parser.supported_exts:
+            for ext in parser.supported_exts:
+                insert_element_to_dict_of_list(self._specific_parsers_by_ext, ext, position)
             for typ in parser.supported_types:
-                insert_element_to_dict_of_list(self._strict_types_to_ext, typ, ext)
-                insert_element_to_dict_of_list(self._ext_to_strict_types, ext, typ)
+                insert_element_to_dict_of_list(self._specific_parsers_by_type, typ, position)
 
     def get_all_parsers(self, strict_type_matching: bool = False) -> List[Parser]:
         """
@@ -569,9 +576,20 @@ class ParserCache(AbstractParserCache):
         no_ext_match_but_type_match = []
         no_match = []
 
+        # use the inverted indexes to know which parsers support the extension, and which specific parsers may support
+        # the type. Parsers outside of these sets can not match, so we do not need to ask them.
+        if required_ext is JOKER:
+            generic_ext_matches = range(len(self._generic_parsers))
+            specific_ext_matches = range(len(self._specific_parsers))
+        else:
+            generic_ext_matches = set(self._generic_parsers_by_ext.get(required_ext, ()))
+            specific_ext_matches = set(self._specific_parsers_by_ext.get(required_ext, ()))
+        specific_type_candidates = self._get_specific_parsers_positions_for_type(desired_type, strict)
+
         # handle generic parsers first - except if desired type is Any
-        for p in self._generic_parsers:
-            match = p.is_able_to_parse(desired_type=desired_type, desired_ext=required_ext, strict=strict)
+        for i, p in enumerate(self._generic_parsers):
+            match = i in generic_ext_matches \
+                    and p.is_able_to_parse(desired_type=desired_type, desired_ext=required_ext, strict=strict)
             if match:
                 # match
                 if is_any_type(desired_type):
@@ -590,7 +608,17 @@ class ParserCache(AbstractParserCache):
                     pass
 
         # then the specific
-        for p in self._specific_parsers:
+        for i, p in enumerate(self._specific_parsers):
+            if i not in specific_ext_matches:
+                # no match on extension - only the type may match
+                if specific_type_candidates is not None and i not in specific_type_candidates:
+                    no_match.append(p)
+                elif p.is_able_to_parse(desired_type=desired_type, desired_ext=JOKER, strict=strict):
+                    no_ext_match_but_type_match.append(p)
+                else:
+                    no_match.append(p)
+                continue
+
             match, exact_match = p.is_able_to_parse_detailed(desired_type=desired_type,
                                                              desired_ext=required_ext,
                                                              strict=strict)
@@ -620,6 +648,30 @@ class ParserCache(AbstractParserCache):
         return (matching_parsers_generic, matching_parsers_approx, matching_parsers_exact), \
                no_type_match_but_ext_match, no_ext_match_but_type_match, no_match
 
+    def _get_specific_parsers_positions_for_type(self, desired_type: Type[Any], strict: bool) -> Optional[Set[int]]:
+        """
+        Utility method to return the positions of the specific parsers that may be able to parse the desired type,
+        according to the types they declare. In strict mode this is a simple lookup, otherwise all indexed types
+        that are subclasses of the desired type are collected. Parsers may still refuse the type (for example with
+        their custom is_able_to_parse_func), so this is only a superset of the parsers able to parse the type.
+
+        :param desired_type:
+        :param strict:
+        :return: a set of positions in self._specific_parsers, or None if all parsers should be considered
+        """
+        if desired_type is JOKER:
+            return None
+        elif strict:
+            return set(self._specific_parsers_by_type.get(desired_type, ()))
+        else:
+            try:
+                return {position for typ, positions in self._specific_parsers_by_type.items()
+                        if typ is desired_type or issubclass(typ, desired_type)
+                        for position in positions}
+            except TypeError:
+                # some types (for example parametrized generics) can not be used with issubclass: let parsers decide
+                return None
+
 
 class ParserRegistry(ParserCache, ParserFinder, DelegatingParser):
     """
@@ -640,6 +692,16 @@ class ParserRegistry(ParserCache, ParserFinder, DelegatingParser):
         check_var(strict_matching, var_types=bool, var_name='strict_matching')
         self.is_strict = strict_matching
 
+        # the parsers built by build_parser_for_fileobject_and_desiredtype, in least recently used order. Invalidated
+        # every time a parser is registered.
+        self._built_parsers_cache = OrderedDict()
+
+        # the number of nested registration batches in progress (see registration_batch)
+        self._registration_batch_depth = 0
+
+        # the outcomes of the parsers of the cascades, used when adaptive cascades are enabled (see get_cascade_stats)
+        self._cascade_stats = CascadeStats()
+
         # add provided parsers
         if initial_parsers_to_register is not None:
             self.register_parsers(initial_parsers_to_register)
@@ -647,6 +709,65 @@ class ParserRegistry(ParserCache, ParserFinder, DelegatingParser):
     def __str__(self):
         return self.pretty_name
 
+    @contextmanager
+    def registration_batch(self):
+        """
+        Context manager to register several parsers (and converters) at once. The caches are invalidated once at the
+        end of the batch rather than after each registration, and are not used by the queries made within the batch,
+        so that the result is the same as registering everything one by one.
+
+        >>> with registry.registration_batch():
+        >>>     registry.register_parsers(...)
+        >>>     registry.register_converters(...)
+
+        :return:
+        """
+        self._registration_batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._registration_batch_depth -= 1
+            if self._registration_batch_depth == 0:
+                self._clear_caches()
+
+    def register_parsers(self, parsers: List[Parser]):
+        """
+        Overrides the parent method to register all parsers in a single registration batch
+
+        :param parsers:
+        :return:
+        """
+        with self.registration_batch():
+            super(ParserRegistry, self).register_parsers(parsers)
+
+    def register_parser(self, parser: Parser):
+        """
+        Overrides the parent method to invalidate the cache of built parsers
+
+        :param parser:
+        :return:
+        """
+        super(ParserRegistry, self).register_parser(parser)
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        """
+        Invalidates the caches that depend on the registered parsers and converters, except within a registration batch
+        where this is done at the end of the batch.
+
+        :return:
+        """
+        if self._registration_batch_depth == 0:
+            self._clear_caches()
+
+    def _clear_caches(self):
+        """
+        Clears the caches that depend on the registered parsers and converters
+
+        :return:
+        """
+        self._built_parsers_cache.clear()
+
     def _create_parsing_plan(self, desired_type: Type[T], filesystem_object: PersistedObject, logger: Logger,
                              log_only_last: bool = False) -> ParsingPlan[T]:
         """
@@ -661,8 +782,29 @@ class ParserRegistry(ParserCache, ParserFinder, DelegatingParser):
         # find the parser for this object
         t, combined_parser = self.build_parser_for_fileobject_and_desiredtype(filesystem_object, desired_type,
                                                                            logger=logger)
-        # ask the parser for the parsing plan
-        return combined_parser.create_parsing_plan(t, filesystem_object, logger)
+        # ask the parser for the parsing plan. The cascades will use the outcomes recorded in this registry
+        with using_cascade_stats(self._cascade_stats):
+            return combined_parser.create_parsing_plan(t, filesystem_object, logger)
+
+    def get_cascade_stats(self) -> Dict[Tuple[Type, str], Dict[Tuple[Type, Parser], Tuple[int, int]]]:
+        """
+        Returns the outcomes of the parsers tried by the parsing cascades of the plans created by this registry, since
+        adaptive cascades were enabled with parsyfiles_global_config(adaptive_cascades=True), or since the last call to
+        clear_cascade_stats(). For each desired type and file extension, a dictionary gives the number of successes and
+        failures of each (type, parser) of the cascades. See CascadeStats.
+
+        :return:
+        """
+        return self._cascade_stats.get_all()
+
+    def clear_cascade_stats(self):
+        """
+        Forgets the outcomes of the parsers tried by the parsing cascades of the plans created by this registry, so
+        that they go back to their default order.
+
+        :return:
+        """
+        self._cascade_stats.clear()
 
     def build_parser_for_fileobject_and_desiredtype(self, obj_on_filesystem: PersistedObject, object_type: Type[T],
                                                     logger: Logger = None) -> Tuple[Type, Parser]:
@@ -676,14 +818,71 @@ class ParserRegistry(ParserCache, ParserFinder, DelegatingParser):
         If several alternatives are requested (through a root Union type), this is done independently for each
         alternative.
 
+        The result only depends on the desired type, and on the extension and kind (singlefile or multifile) of the
+        object on the filesystem. It is therefore cached (see `parsyfiles_global_config(parsers_cache_size)`) until
+        the next registration, or until new subclasses of the desired type are defined. Note that the warnings logged
+        while building the parser are not logged again when it is reused.
+
         :param obj_on_filesystem:
         :param object_type:
         :param logger:
         :return: a type to use and a parser. The type to use is either directly the one provided, or a resolved one in
         case of TypeVar
         """
+        if self._registration_batch_depth > 0:
+            # the cache may be outdated
+            return self._build_parser_for_fileobject_and_alternate_types(obj_on_filesystem, object_type, logger)
+
+        # the identity of the type is used and not its equality, since for example Union[int, str] == Union[str, int]
+        # while the order of their alternate types is different. The type is kept alive in the entry so that its id
+        # can not be reused while it is in there.
+        key = (id(object_type), obj_on_filesystem.ext, obj_on_filesystem.is_singlefile,
+               GLOBAL_CONFIG.dict_to_object_subclass_limit)
+        try:
+            _, object_types, subclasses, res = self._built_parsers_cache[key]
+        except KeyError:
+            pass
+        else:
+            if _get_subclasses_snapshot(object_types) == subclasses:
+                try:
+                    self._built_parsers_cache.move_to_end(key)
+                except KeyError:
+                    # removed concurrently (this cache may be shared by several RootParser copies)
+                    pass
+                return res
+
         # First resolve TypeVars and Unions to get a list of compliant types
         object_types = get_alternate_types_resolving_forwardref_union_and_typevar(object_type)
+        subclasses = _get_subclasses_snapshot(object_types)
+        res = self._build_parser_for_fileobject_and_alternate_types(obj_on_filesystem, object_type, logger,
+                                                                     object_types=object_types)
+
+        if GLOBAL_CONFIG.parsers_cache_size > 0:
+            self._built_parsers_cache[key] = (object_type, object_types, subclasses, res)
+            while len(self._built_parsers_cache) > GLOBAL_CONFIG.parsers_cache_size:
+                try:
+                    self._built_parsers_cache.popitem(last=False)
+                except KeyError:
+                    # emptied concurrently
+                    break
+        return res
+
+    def _build_parser_for_fileobject_and_alternate_types(self, obj_on_filesystem: PersistedObject,
+                                                         object_type: Type[T], logger: Logger = None,
+                                                         object_types: List[Type] = None) -> Tuple[Type, Parser]:
+        """
+        Builds a parser for each alternate type of object_type, and combines them. See
+        build_parser_for_fileobject_and_desiredtype for details.
+
+        :param obj_on_filesystem:
+        :param object_type:
+        :param logger:
+        :param object_types: the list of alternate types of object_type, if already resolved
+        :return:
+        """
+        # First resolve TypeVars and Unions to get a list of compliant types
+        if object_types is None:
+            object_types = get_alternate_types_resolving_forwardref_union_and_typevar(object_type)
 
         if len(object_types) == 1:
             # One type: proceed as usual
@@ -816,6 +1015,22 @@ class ParserRegistry(ParserCache, ParserFinder, DelegatingParser):
             return CascadingParser(list(reversed(matching_parsers)))
 
 
+def _get_subclasses_snapshot(types: Sequence[Type[Any]]) -> Set[Type[Any]]:
+    """
+    Returns the set of all classes currently inheriting from one of the given types, except for collection types since
+    their subclasses are not explored when building parsers. This is much cheaper than get_all_subclasses, and is used
+    to detect that new subclasses were defined since a parser was built.
+
+    :param types:
+    :return:
+    """
+    res = set()
+    for typ in types:
+        if not is_collection(typ, strict=True):
+            res.update(_get_subclasses_tree(typ))
+    return res
+
+
 class AttrConversionException(ConversionException):
     """
     Raised whenever parsing fails
@@ -1175,19 +1390,37 @@ class ConverterCache(AbstractConverterCache):
     This object is responsible to store converters in memory, and provide ways to access the information by queries
     (by from_type, by to_type, both, none), using strict mode, or inference mode (subclass allowed). Note that
     due to the complexity of conversion chains, strict mode is set at creation time, not at query time.
+
+    Converters are seen as the links of a graph, and conversion chains as the paths in this graph. Registering a
+    converter does not create any chain: chains are searched lazily when a query is made, and the results are memoized
+    until the next registration.
     """
     def __init__(self, strict_matching: bool):
         super(ConverterCache, self).__init__(strict_matching)
 
-        self._specific_conversion_chains = list()
-        self._specific_non_strict_conversion_chains = list()
-        self._generic_conversion_chains = list()
-        self._generic_nonstrict_conversion_chains = list()
+        # the registered converters, in registration order. Everywhere else they are referred to by their position
+        self._converters = list()
+
+        # indexes: source type > positions, destination type > positions of the non-generic converters, and positions
+        # of the generic converters
+        self._converters_by_from_type = dict()
+        self._converters_by_to_type = dict()
+        self._generic_converters = list()
+
+        # the conversion graph: for each converter, the (position, strict) of all converters that can precede it in a
+        # chain. It is completed lazily with the converters registered since the last query
+        self._predecessors = list()
+        self._worth_chaining = dict()
+
+        # memoized paths (by position of their last converter), chains (by path) and query results
+        self._conversion_paths_to = dict()
+        self._conversion_chains = dict()
+        self._conversion_chains_queries = dict()
 
     def register_converter(self, converter: Converter[S, T]):
         """
-        Utility method to register any converter. Converters that support any type will be stored in the "generic"
-        lists, and the others will be stored in front of the types they support
+        Utility method to register any converter. The conversion chains that it enables will be found at the next
+        query.
         :return:
         """
         check_var(converter, var_types=Converter, var_name='converter')
@@ -1198,155 +1431,175 @@ class ConverterCache(AbstractConverterCache):
             raise ValueError('Converter ' + str(converter) + ' can not be registered since it does not handle the JOKER'
                              ' cases correctly')
 
-        # compute all possible chains and save them
-        generic_chains, generic_nonstrict_chains, specific_chains, specific_nonstrict_chains \
-            = self._create_all_new_chains(converter)
-        self._generic_nonstrict_conversion_chains += generic_nonstrict_chains
-        self._generic_conversion_chains += generic_chains
-        self._specific_non_strict_conversion_chains += specific_nonstrict_chains
-        self._specific_conversion_chains += specific_chains
+        # store it. The new chains it allows will be found at the next query. Existing links and chains are still
+        # valid, only the memoized paths and query results need to be forgotten.
+        position = len(self._converters)
+        self._converters.append(converter)
+        insert_element_to_dict_of_list(self._converters_by_from_type, converter.from_type, position)
+        if converter.is_generic():
+            self._generic_converters.append(position)
+        else:
+            insert_element_to_dict_of_list(self._converters_by_to_type, converter.to_type, position)
+
+        self._conversion_paths_to.clear()
+        self._conversion_chains_queries.clear()
+
+    def _get_link(self, left: int, right: int) -> Optional[bool]:
+        """
+        Utility method to know if the converter at position `right` may directly follow the converter at position `left`
+        in a chain. Generic converters may not be chained together, and a generic converter may only be followed by a
+        converter registered before itself.
+
+        :param left:
+        :param right:
+        :return: None if there is no link, True if the link is strict, False if it is non-strict
+        """
+        left_converter, right_converter = self._converters[left], self._converters[right]
+        if left_converter.is_generic() and (right_converter.is_generic() or right > left):
+            return None
+        elif not self._is_worth_chaining(left, right):
+            return None
+        elif right_converter.can_be_appended_to(left_converter, strict=True):
+            return True
+        elif (not self.strict) and right_converter.can_be_appended_to(left_converter, strict=False):
+            return False
+        else:
+            return None
 
-        # sort all lists by length
-        self._generic_nonstrict_conversion_chains = sorted(self._generic_nonstrict_conversion_chains, key=len,
-                                                           reverse=True)
-        self._generic_conversion_chains = sorted(self._generic_conversion_chains, key=len, reverse=True)
-        self._specific_non_strict_conversion_chains = sorted(self._specific_non_strict_conversion_chains, key=len,
-                                                             reverse=True)
-        self._specific_conversion_chains = sorted(self._specific_conversion_chains, key=len, reverse=True)
+    def _is_worth_chaining(self, left: int, right: int) -> bool:
+        """
+        Memoized version of Converter.are_worth_chaining, for the converters at the given positions
 
-    def _create_all_new_chains(self, converter) -> Tuple[List[Converter], List[Converter],
-                                                         List[Converter], List[Converter]]:
+        :param left:
+        :param right:
+        :return:
         """
-        Creates all specific and generic chains that may be built by adding this converter to the existing chains.
+        try:
+            return self._worth_chaining[(left, right)]
+        except KeyError:
+            res = Converter.are_worth_chaining(self._converters[left], self._converters[right])
+            self._worth_chaining[(left, right)] = res
+            return res
 
-        :param converter:
-        :return: generic_chains, generic_nonstrict_chains, specific_chains, specific_nonstrict_chains
+    def _get_predecessors(self) -> List[List[Tuple[int, bool]]]:
         """
+        Returns the conversion graph, after adding the links of the converters registered since the last call.
 
-        specific_chains, specific_nonstrict_chains, generic_chains, generic_nonstrict_chains = [], [], [], []
+        :return: for each converter position, the list of (position, strict) of the converters that may precede it
+        """
+        for new in range(len(self._predecessors), len(self._converters)):
+            self._predecessors.append(list())
+            for existing in range(new):
+                link = self._get_link(existing, new)
+                if link is not None:
+                    self._predecessors[new].append((existing, link))
+                link = self._get_link(new, existing)
+                if link is not None:
+                    self._predecessors[existing].append((new, link))
+        return self._predecessors
 
-        if converter.is_generic():
-            # the smaller chain : the singleton :)
-            generic_chains.append(ConversionChain(initial_converters=[converter], strict_chaining=True))
+    def _get_conversion_paths_to(self, last: int) -> List[Tuple[Tuple[int, ...], bool]]:
+        """
+        Returns all paths in the conversion graph ending with the converter at position `last`. A path is valid if all
+        of its converters are worth chaining with all the converters after them (see ConversionChain.are_worth_chaining)
+        which also prevents cycles. A path is strict if all its links are strict.
+
+        :param last:
+        :return: a list of (path, strict), where path is a tuple of converter positions
+        """
+        try:
+            return self._conversion_paths_to[last]
+        except KeyError:
+            pass
+
+        predecessors = self._get_predecessors()
+        paths = []
+        to_explore = [((last,), True)]
+        while len(to_explore) > 0:
+            path, strict = to_explore.pop()
+            paths.append((path, strict))
+            for previous, strict_link in predecessors[path[0]]:
+                if previous not in path and all(self._is_worth_chaining(previous, p) for p in path[1:]):
+                    to_explore.append(((previous,) + path, strict and strict_link))
+
+        self._conversion_paths_to[last] = paths
+        return paths
+
+    def _get_conversion_chain(self, path: Tuple[int, ...], strict: bool) -> Converter:
+        """
+        Returns the conversion chain for the given path, creating it the first time
+
+        :param path:
+        :param strict:
+        :return:
+        """
+        try:
+            return self._conversion_chains[path]
+        except KeyError:
+            chain = ConversionChain(initial_converters=[self._converters[i] for i in path], strict_chaining=strict)
+            self._conversion_chains[path] = chain
+            return chain
+
+    def _get_chain_sort_key(self, path_and_strict: Tuple[Tuple[int, ...], bool]):
+        """
+        The key used to sort chains from *less relevant* to *most relevant*: generic chains first, non-strict before
+        strict, longest first. Among chains of the same length, the ones involving the most recently registered
+        converter come last, with that converter at the end, then at the beginning, then inside the chain.
+
+        :param path_and_strict:
+        :return:
+        """
+        path, strict = path_and_strict
+        newest = max(path)
+        newest_idx = path.index(newest)
+        newest_position = 0 if newest_idx == len(path) - 1 else (1 if newest_idx == 0 else 2)
+        return not self._converters[path[-1]].is_generic(), strict, -len(path), newest, newest_position, path
+
+    def _get_converters_positions_from(self, from_type: Type[Any]) -> Iterable[int]:
+        """
+        Uses the index to return the positions of the converters that may be able to convert from from_type. In
+        non-strict mode this includes all converters whose source type is a parent class of from_type. Converters may
+        still refuse the type (for example with their custom is_able_to_convert_func).
+
+        :param from_type:
+        :return:
+        """
+        if from_type is JOKER or is_any_type(from_type):
+            return range(len(self._converters))
+        elif self.strict:
+            return self._converters_by_from_type.get(from_type, ())
         else:
-            specific_chains.append(ConversionChain(initial_converters=[converter], strict_chaining=True))
+            try:
+                return {position for typ, positions in self._converters_by_from_type.items()
+                        if typ is from_type or issubclass(from_type, typ)
+                        for position in positions}
+            except TypeError:
+                # some types (for example parametrized generics) can not be used with issubclass: ask all converters
+                return range(len(self._converters))
 
+    def _get_converters_positions_to(self, to_type: Type[Any]) -> Iterable[int]:
+        """
+        Uses the index to return the positions of the converters that may be able to convert to to_type: generic
+        converters, converters producing to_type and in non-strict mode, converters producing a subclass of to_type.
+        Converters may still refuse the type (for example with their custom is_able_to_convert_func).
+
+        :param to_type:
+        :return:
+        """
+        if to_type is JOKER:
+            return range(len(self._converters))
 
-        # 1) create new specific chains by adding this converter at the beginning or end of all *non-generic* ones
-        # -- non-strict
-        new_c_at_end_ns = []
-        new_c_at_beginning_ns = []
+        positions = set(self._generic_converters)
+        positions.update(self._converters_by_to_type.get(to_type, ()))
         if not self.strict:
-            # then there are non-strict chains already. Try to connect to them
-            for existing_specific_nonstrict in self._specific_non_strict_conversion_chains:
-                if converter.can_be_appended_to(existing_specific_nonstrict, strict=False):
-                    if ConversionChain.are_worth_chaining(existing_specific_nonstrict, converter):
-                        new_c_at_end_ns.append(ConversionChain.chain(existing_specific_nonstrict, converter,
-                                                                     strict=False))
-                if existing_specific_nonstrict.can_be_appended_to(converter, strict=False):
-                    if ConversionChain.are_worth_chaining(converter, existing_specific_nonstrict):
-                        new_c_at_beginning_ns.append(ConversionChain.chain(converter, existing_specific_nonstrict,
-                                                                           strict=False))
-
-        # -- strict
-        new_c_at_end = []
-        new_c_at_beginning = []
-        for existing_specific in self._specific_conversion_chains:
-            # first try *strict* mode
-            if converter.can_be_appended_to(existing_specific, strict=True):
-                if ConversionChain.are_worth_chaining(existing_specific, converter):
-                    new_c_at_end.append(ConversionChain.chain(existing_specific, converter, strict=True))
-            elif (not self.strict) and converter.can_be_appended_to(existing_specific, strict=False):
-                if ConversionChain.are_worth_chaining(existing_specific, converter):
-                    new_c_at_end_ns.append(ConversionChain.chain(existing_specific, converter, strict=False))
-
-            if existing_specific.can_be_appended_to(converter, strict=True):
-                if ConversionChain.are_worth_chaining(converter, existing_specific):
-                    # TODO this is where when chaining a generic to a specific, we would actually have to restrict it
-                    # note: but maybe we dont care since now this is checked and prevented in the convert() method
-                    new_c_at_beginning.append(ConversionChain.chain(converter, existing_specific, strict=True))
-            elif (not self.strict) and existing_specific.can_be_appended_to(converter, strict=False):
-                if ConversionChain.are_worth_chaining(converter, existing_specific):
-                    # TODO this is where when chaining a generic to a specific, we would actually have to restrict it
-                    # note: but maybe we dont care since now this is checked and prevented in the convert() method
-                    new_c_at_beginning_ns.append(ConversionChain.chain(converter, existing_specific, strict=False))
-
-        # append to the right list depending on the nature of this converter
-        if converter.is_generic():
-            generic_chains += new_c_at_end
-            generic_nonstrict_chains += new_c_at_end_ns
-        else:
-            specific_chains += new_c_at_end
-            specific_nonstrict_chains += new_c_at_end_ns
-        # common for both types
-        specific_chains += new_c_at_beginning
-        specific_nonstrict_chains += new_c_at_beginning_ns
-
-        # by combining all created chains into a big one
-        for a in new_c_at_end:
-            for b in new_c_at_beginning:
-                b_ = b.remove_first()
-                if b_.can_be_appended_to(a, strict=True):
-                    if ConversionChain.are_worth_chaining(a, b_):
-                        specific_chains.append(ConversionChain.chain(a, b_, strict=True))
-            for b in new_c_at_beginning_ns:
-                b_ = b.remove_first()
-                if b_.can_be_appended_to(a, strict=False):
-                    if ConversionChain.are_worth_chaining(a, b_):
-                        specific_nonstrict_chains.append(ConversionChain.chain(a, b_, strict=False))
-        for a in new_c_at_end_ns:
-            for b in (new_c_at_beginning_ns + new_c_at_beginning):
-                b_ = b.remove_first()
-                if b_.can_be_appended_to(a, strict=False):
-                    if ConversionChain.are_worth_chaining(a, b_):
-                        specific_nonstrict_chains.append(ConversionChain.chain(a, b_, strict=False))
-
-        # by inserting this converter at the beginning of an existing *generic*
-        if converter.is_generic():
-            # we want to avoid chaining generic converters together
-            pass
-        else:
-            new_c_at_beginning_generic = []
-            new_c_at_beginning_generic_ns = []
-            for existing_specific in self._generic_conversion_chains:
-                # start with strict
-                if existing_specific.can_be_appended_to(converter, strict=True):
-                    if ConversionChain.are_worth_chaining(converter, existing_specific):
-                        new_c_at_beginning_generic.append(ConversionChain.chain(converter, existing_specific,
-                                                                                strict=True))
-                elif (not self.strict) and existing_specific.can_be_appended_to(converter, strict=False):
-                    if ConversionChain.are_worth_chaining(converter, existing_specific):
-                        new_c_at_beginning_generic_ns.append(ConversionChain.chain(converter, existing_specific,
-                                                                                   strict=False))
-
-            for existing_specific_ns in self._generic_nonstrict_conversion_chains:
-                if existing_specific_ns.can_be_appended_to(converter, strict=False):
-                    if ConversionChain.are_worth_chaining(converter, existing_specific_ns):
-                        new_c_at_beginning_generic_ns.append(ConversionChain.chain(converter, existing_specific_ns,
-                                                                               strict=False))
-            generic_chains += new_c_at_beginning_generic
-            generic_nonstrict_chains += new_c_at_beginning_generic_ns
-
-            # by combining specific and generic created chains into a big one
-            for a in new_c_at_end:
-                for b in new_c_at_beginning_generic:
-                    b_ = b.remove_first()
-                    if b_.can_be_appended_to(a, strict=True):
-                        if ConversionChain.are_worth_chaining(a, b_):
-                            generic_chains.append(ConversionChain.chain(a, b_, strict=True))
-                for b in new_c_at_beginning_generic_ns:
-                    b_ = b.remove_first()
-                    if b_.can_be_appended_to(a, strict=False):
-                        if ConversionChain.are_worth_chaining(a, b_):
-                            generic_nonstrict_chains.append(ConversionChain.chain(a, b_, strict=False))
-            for a in new_c_at_end_ns:
-                for b in (new_c_at_beginning_generic_ns + new_c_at_beginning_generic):
-                    b_ = b.remove_first()
-                    if b_.can_be_appended_to(a, strict=False):
-                        if ConversionChain.are_worth_chaining(a, b_):
-                            generic_nonstrict_chains.append(ConversionChain.chain(a, b_, strict=False))
-
-        return generic_chains, generic_nonstrict_chains, specific_chains, specific_nonstrict_chains
+            try:
+                positions.update(position for typ, positions_ in self._converters_by_to_type.items()
+                                 if issubclass(typ, to_type)
+                                 for position in positions_)
+            except TypeError:
+                # some types (for example parametrized generics) can not be used with issubclass: ask all converters
+                return range(len(self._converters))
+        return positions
 
     def get_all_conversion_chains(self, from_type: Type[Any] = JOKER, to_type: Type[Any] = JOKER) \
             -> Tuple[List[Converter], List[Converter], List[Converter]]:
@@ -1362,15 +1615,37 @@ class ConverterCache(AbstractConverterCache):
         converters able to produce any type of object", which is different from "to_type=JOKER" which means "all
         converters whatever type they are able to produce".
         :return: a tuple of lists of matching converters, by type of *dest_type* match : generic, approximate, exact.
-        The order of each list is from *less relevant* to *most relevant*
+        The order of each list is from *less relevant* to *most relevant*. The results are cached until the next
+        registration, and the returned lists are copies.
         """
+        key = (from_type, to_type)
+        try:
+            res = self._conversion_chains_queries[key]
+        except KeyError:
+            res = self._find_all_conversion_chains(from_type, to_type)
+            self._conversion_chains_queries[key] = res
+        except TypeError:
+            # unhashable type: no cache
+            res = self._find_all_conversion_chains(from_type, to_type)
+
+        return tuple(list(l) for l in res)
 
+    def _find_all_conversion_chains(self, from_type: Type[Any] = JOKER, to_type: Type[Any] = JOKER) \
+            -> Tuple[List[Converter], List[Converter], List[Converter]]:
+        """
+        Implementation of get_all_conversion_chains, without the cache
+
+        :param from_type:
+        :param to_type:
+        :return:
+        """
         if from_type is JOKER and to_type is JOKER:
-            matching_dest_generic = self._generic_nonstrict_conversion_chains.copy() + \
-                                    self._generic_conversion_chains.copy()
+            paths = [p for last in range(len(self._converters)) for p in self._get_conversion_paths_to(last)]
+            chains = [self._get_conversion_chain(*p) for p in sorted(paths, key=self._get_chain_sort_key)]
+
+            matching_dest_generic = [c for c in chains if c.is_generic()]
             matching_dest_approx = []
-            matching_dest_exact = self._specific_non_strict_conversion_chains.copy() + \
-                                  self._specific_conversion_chains.copy()
+            matching_dest_exact = [c for c in chains if not c.is_generic()]
 
         else:
             matching_dest_generic, matching_dest_approx, matching_dest_exact = [], [], []
@@ -1378,13 +1653,25 @@ class ConverterCache(AbstractConverterCache):
             # first transform any 'Any' type requirement into the official class for that
             to_type = get_validated_type(to_type, 'to_type', enforce_not_joker=False)
 
-            # handle generic converters first
-            for c in (self._generic_nonstrict_conversion_chains + self._generic_conversion_chains):
+            # only the paths starting with a converter able to take from_type and ending with a converter able to
+            # produce to_type may match
+            lasts = [i for i in self._get_converters_positions_to(to_type)
+                     if self._converters[i].is_able_to_convert(self.strict, from_type=JOKER, to_type=to_type)]
+            if from_type is JOKER:
+                firsts = None
+            else:
+                firsts = {i for i in self._get_converters_positions_from(from_type)
+                          if self._converters[i].is_able_to_convert(self.strict, from_type=from_type, to_type=JOKER)}
+            paths = [p for last in lasts for p in self._get_conversion_paths_to(last)
+                     if firsts is None or p[0][0] in firsts]
+
+            for c in (self._get_conversion_chain(*p) for p in sorted(paths, key=self._get_chain_sort_key)):
                 match, source_exact, dest_exact = c.is_able_to_convert_detailed(strict=self.strict,
                                                                                 from_type=from_type,
                                                                                 to_type=to_type)
-                if match:
-                    # match
+                if not match:
+                    pass
+                elif c.is_generic():
                     if is_any_type(to_type):
                         # special case where desired to_type is already Any : in that case a generic converter will
                         # appear in 'exact match'
@@ -1392,27 +1679,83 @@ class ConverterCache(AbstractConverterCache):
                     else:
                         # this is a match from a generic parser to a specific type : add in 'generic' cataegory
                         matching_dest_generic.append(c)
-
-            # then the specific
-            for c in (self._specific_non_strict_conversion_chains + self._specific_conversion_chains):
-                match, source_exact, dest_exact = c.is_able_to_convert_detailed(strict=self.strict,
-                                                                                from_type=from_type,
-                                                                                to_type=to_type)
-                if match:
-                    if not is_any_type(to_type):
-                        if dest_exact:
-                            # we dont care if source is exact or approximate as long as dest is exact
-                            matching_dest_exact.append(c)
-                        else:
-                            # this means that dest is approximate.
-                            matching_dest_approx.append(c)
+                elif not is_any_type(to_type):
+                    if dest_exact:
+                        # we dont care if source is exact or approximate as long as dest is exact
+                        matching_dest_exact.append(c)
                     else:
-                        # we only want to keep the generic ones, and they have already been added
-                        pass
+                        # this means that dest is approximate.
+                        matching_dest_approx.append(c)
+                else:
+                    # we only want to keep the generic ones, and they have already been added
+                    pass
 
         return matching_dest_generic, matching_dest_approx, matching_dest_exact
 
 
+def _get_root_modules(typ: Type[Any]) -> Set[str]:
+    """
+    Returns the names of the top-level packages where the given type, and the types it is parametrized with (for
+    example List[DataFrame] or Union[int, DataFrame]), are defined
+
+    :param typ:
+    :return:
+    """
+    res = {getattr(typ, '__module__', None) or ''}
+    for arg in getattr(typ, '__args__', None) or ():
+        res.update(_get_root_modules(arg))
+    return {module_name.split('.')[0] for module_name in res}
+
+
+# held while lazy plugins are loaded, so that concurrent threads (possibly using different RootParser copies sharing
+# the same registry) do not load the same plugin twice. Reentrant since loading a plugin may trigger queries.
+_lazy_plugins_lock = RLock()
+
+
+class LazyPlugin(object):
+    """
+    A plugin that is declared to a ParserRegistryWithConverters without importing it. Its parsers and converters are
+    only registered (typically importing some heavy module) the first time that one of its file extensions is
+    requested while building a parsing plan, or that a type defined in one of its modules is requested.
+    """
+    def __init__(self, name: str, register_func: Callable[['ParserRegistryWithConverters'], None],
+                 supported_exts: Set[str], supported_modules: Set[str], shared_exts: Set[str] = None,
+                 shared_exts_types: Set[Type[Any]] = None):
+        """
+        Constructor
+
+        :param name: the name of this plugin, for display
+        :param register_func: a function registering the parsers and converters of this plugin on the registry that
+        it receives. It should be picklable (a module-level function) if the registry is to be copied or saved.
+        :param supported_exts: the file extensions that trigger the loading of this plugin
+        :param supported_modules: the top-level packages (for example 'pandas') defining the types that trigger the
+        loading of this plugin
+        :param shared_exts: the file extensions supported by this plugin that are also commonly supported by other
+        parsers (such as '.txt'). They only trigger the loading of this plugin if the desired type is one of
+        shared_exts_types, or may be converted from one of them. Default is None (no shared extensions)
+        :param shared_exts_types: the types, other than the ones defined in supported_modules, that this plugin may
+        produce from the shared_exts. Default is None (none)
+        """
+        check_var(name, var_types=str, var_name='name')
+        check_var(supported_exts, var_types=set, var_name='supported_exts')
+        check_var(supported_modules, var_types=set, var_name='supported_modules')
+        check_var(shared_exts, var_types=set, var_name='shared_exts', enforce_not_none=False)
+        check_var(shared_exts_types, var_types=set, var_name='shared_exts_types', enforce_not_none=False)
+        self.name = name
+        self.register_func = register_func
+        self.supported_exts = supported_exts
+        self.supported_modules = supported_modules
+        self.shared_exts = shared_exts or set()
+        self.shared_exts_types = shared_exts_types or set()
+
+    def __str__(self):
+        return '<lazy plugin ' + self.name + ' for ' + str(sorted(self.supported_exts | self.shared_exts)) \
+               + ' and types of ' + str(sorted(self.supported_modules)) + '>'
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class ParserRegistryWithConverters(ConverterCache, ParserRegistry, ConversionFinder):
     """
     Base class able to combine parsers and converters to create parsing chains.
@@ -1428,6 +1771,13 @@ class ParserRegistryWithConverters(ConverterCache, ParserRegistry, ConversionFin
         :param initial_parsers_to_register:
         :param initial_converters_to_register:
         """
+        # the results of find_all_matching_parsers, invalidated every time a parser or a converter is registered. This
+        # is a LRU cache bounded by GLOBAL_CONFIG.parsers_cache_size
+        self._matching_parsers_cache = OrderedDict()
+
+        # the lazy plugins that are not loaded yet, in registration order
+        self._lazy_plugins = list()
+
         # make sure all init are called
         ConverterCache.__init__(self, strict_matching=strict_matching)
         ParserRegistry.__init__(self, pretty_name=pretty_name, strict_matching=strict_matching,
@@ -1437,6 +1787,186 @@ class ParserRegistryWithConverters(ConverterCache, ParserRegistry, ConversionFin
         if initial_converters_to_register is not None:
             self.register_converters(initial_converters_to_register)
 
+    def register_converters(self, converters: List[Converter[S, T]]):
+        """
+        Overrides the parent method to register all converters in a single registration batch
+
+        :param converters:
+        :return:
+        """
+        with self.registration_batch():
+            super(ParserRegistryWithConverters, self).register_converters(converters)
+
+    def register_converter(self, converter: Converter[S, T]):
+        """
+        Overrides the parent method to invalidate the caches of find_all_matching_parsers and of built parsers
+
+        :param converter:
+        :return:
+        """
+        super(ParserRegistryWithConverters, self).register_converter(converter)
+        self._invalidate_caches()
+
+    def _clear_caches(self):
+        """
+        Overrides the parent method to also clear the cache of find_all_matching_parsers
+
+        :return:
+        """
+        super(ParserRegistryWithConverters, self)._clear_caches()
+        self._matching_parsers_cache.clear()
+
+    def register_lazy_plugin(self, plugin: LazyPlugin):
+        """
+        Declares a plugin whose parsers and converters will only be registered when needed, see LazyPlugin. Lazy
+        plugins are always loaded in the order in which they were declared: loading one also loads all the ones
+        declared before it, so that the registration order (and therefore the parsers priorities) does not depend on
+        the files parsed first.
+
+        :param plugin:
+        :return:
+        """
+        check_var(plugin, var_types=LazyPlugin, var_name='plugin')
+        self._lazy_plugins.append(plugin)
+
+    def get_lazy_plugins(self) -> List[LazyPlugin]:
+        """
+        Returns the lazy plugins that are not loaded yet, in registration order
+
+        :return:
+        """
+        return list(self._lazy_plugins)
+
+    def load_lazy_plugins(self):
+        """
+        Loads all lazy plugins that are not loaded yet
+
+        :return:
+        """
+        with _lazy_plugins_lock:
+            self._load_lazy_plugins(len(self._lazy_plugins))
+
+    def _load_lazy_plugins_for(self, types: Iterable[Type[Any]], ext: str = JOKER):
+        """
+        Loads the lazy plugins supporting one of the given types or the given extension (and the ones declared before
+        them). Jokers do not load anything. For the shared extensions of a plugin, see LazyPlugin, the first type is
+        the desired type.
+
+        :param types:
+        :param ext:
+        :return:
+        """
+        if len(self._lazy_plugins) > 0:
+            types = [typ for typ in types if typ is not JOKER]
+            modules = set()
+            for typ in types:
+                modules.update(_get_root_modules(typ))
+            with _lazy_plugins_lock:
+                nb_to_load = 0
+                for i, plugin in enumerate(self._lazy_plugins):
+                    if ext in plugin.supported_exts or not modules.isdisjoint(plugin.supported_modules) \
+                            or (ext in plugin.shared_exts and len(types) > 0
+                                and any(self._may_produce(typ, types[0]) for typ in plugin.shared_exts_types)):
+                        nb_to_load = i + 1
+                if nb_to_load > 0:
+                    self._load_lazy_plugins(nb_to_load)
+
+    def _may_produce(self, from_type: Type[Any], desired_type: Type[Any]) -> bool:
+        """
+        Returns True if objects of type from_type may be used to produce the desired type, directly or with the
+        registered converters. In doubt (unsupported types) returns True.
+
+        :param from_type:
+        :param desired_type:
+        :return:
+        """
+        try:
+            desired_type = get_validated_type(desired_type, 'desired_type')
+            base_type = get_base_generic_type(desired_type)
+            if issubclass(from_type, base_type) or issubclass(base_type, from_type):
+                return True
+            generic, approx, exact = self.get_all_conversion_chains(from_type=from_type, to_type=desired_type)
+            return len(generic) + len(approx) + len(exact) > 0
+        except TypeError:
+            return True
+
+    def _load_lazy_plugins(self, nb_to_load: int):
+        """
+        Loads the first nb_to_load lazy plugins, in a single registration batch. If the registration of a plugin
+        raises an exception, this plugin and the ones declared after it are not loaded, and remain in the lazy plugins.
+
+        :param nb_to_load:
+        :return:
+        """
+        with _lazy_plugins_lock:
+            to_load = self._lazy_plugins[0:nb_to_load]
+            with self.registration_batch():
+                for plugin in to_load:
+                    if plugin in self._lazy_plugins:
+                        # removed before registering, so that the queries made by register_func do not load it again
+                        self._lazy_plugins.remove(plugin)
+                        try:
+                            plugin.register_func(self)
+                        except Exception:
+                            # put it back so that it may be loaded again later
+                            self._lazy_plugins.insert(0, plugin)
+                            raise
+
+    def build_parser_for_fileobject_and_desiredtype(self, obj_on_filesystem: PersistedObject, object_type: Type[T],
+                                                    logger: Logger = None) -> Tuple[Type, Parser]:
+        """
+        Overrides the parent method to first load the lazy plugins supporting the type or the file extension
+
+        :param obj_on_filesystem:
+        :param object_type:
+        :param logger:
+        :return:
+        """
+        self._load_lazy_plugins_for((object_type,), obj_on_filesystem.ext)
+        return super(ParserRegistryWithConverters, self).build_parser_for_fileobject_and_desiredtype(
+            obj_on_filesystem, object_type, logger=logger)
+
+    def get_all_conversion_chains(self, from_type: Type[Any] = JOKER, to_type: Type[Any] = JOKER) \
+            -> Tuple[List[Converter], List[Converter], List[Converter]]:
+        """
+        Overrides the parent method to first load the lazy plugins supporting one of the types
+
+        :param from_type:
+        :param to_type:
+        :return:
+        """
+        self._load_lazy_plugins_for((from_type, to_type))
+        return super(ParserRegistryWithConverters, self).get_all_conversion_chains(from_type=from_type,
+                                                                                   to_type=to_type)
+
+    def get_all_supported_exts_for_type(self, type_to_match: Type[Any], strict: bool) -> Set[str]:
+        """
+        Overrides the parent method so that the extensions of the lazy plugins that are not loaded yet are listed too,
+        when all types are requested
+
+        :param type_to_match:
+        :param strict:
+        :return:
+        """
+        res = super(ParserRegistryWithConverters, self).get_all_supported_exts_for_type(type_to_match, strict)
+        if type_to_match is JOKER:
+            for plugin in self._lazy_plugins:
+                res.update(plugin.supported_exts)
+        return res
+
+    def print_capabilities_by_ext(self, strict_type_matching: bool = False):
+        """
+        Overrides the parent method to also print the lazy plugins that are not loaded yet
+
+        :param strict_type_matching:
+        :return:
+        """
+        super(ParserRegistryWithConverters, self).print_capabilities_by_ext(strict_type_matching=strict_type_matching)
+        if len(self._lazy_plugins) > 0:
+            print('Lazy plugins not loaded yet: ')
+            pprint(self._lazy_plugins)
+            print('\n')
+
     def find_all_matching_parsers(self, strict: bool, desired_type: Type[Any] = JOKER, required_ext: str = JOKER) \
         -> Tuple[Tuple[List[Parser], List[Parser], List[Parser]],
                  List[Parser], List[Parser], List[Parser]]:
@@ -1444,6 +1974,56 @@ class ParserRegistryWithConverters(ConverterCache, ParserRegistry, ConversionFin
         Overrides the parent method to find parsers appropriate to a given extension and type.
         This leverages both the parser registry and the converter registry to propose parsing chains in a relevant order
 
+        The lazy plugins supporting the desired type are loaded first. The results then only depend on the query and on
+        the registered parsers and converters, so they are cached until the next registration. The returned lists are
+        copies and may be modified by the caller.
+
+        :param strict:
+        :param desired_type: the type of object to match.
+        :param required_ext: the required extension.
+        :return: match=(matching_parsers_generic, matching_parsers_approx, matching_parsers_exact),
+                 no_type_match_but_ext_match, no_ext_match_but_type_match, no_match
+        """
+        self._load_lazy_plugins_for((desired_type,))
+
+        if self._registration_batch_depth > 0:
+            # the cache may be outdated
+            res = self._find_all_matching_parsers(strict, desired_type=desired_type, required_ext=required_ext)
+        else:
+            key = (strict, desired_type, required_ext)
+            try:
+                res = self._matching_parsers_cache[key]
+            except KeyError:
+                res = self._find_all_matching_parsers(strict, desired_type=desired_type, required_ext=required_ext)
+                if GLOBAL_CONFIG.parsers_cache_size > 0:
+                    self._matching_parsers_cache[key] = res
+                    while len(self._matching_parsers_cache) > GLOBAL_CONFIG.parsers_cache_size:
+                        try:
+                            self._matching_parsers_cache.popitem(last=False)
+                        except KeyError:
+                            # emptied concurrently
+                            break
+            except TypeError:
+                # unhashable type: no cache
+                res = self._find_all_matching_parsers(strict, desired_type=desired_type, required_ext=required_ext)
+            else:
+                try:
+                    self._matching_parsers_cache.move_to_end(key)
+                except KeyError:
+                    # removed concurrently (this cache may be shared by several RootParser copies)
+                    pass
+
+        (matching_p_generic, matching_p_approx, matching_p_exact), no_type_match_but_ext_match, \
+            no_ext_match_but_type_match, no_match = res
+        return (list(matching_p_generic), list(matching_p_approx), list(matching_p_exact)), \
+               list(no_type_match_but_ext_match), list(no_ext_match_but_type_match), list(no_match)
+
+    def _find_all_matching_parsers(self, strict: bool, desired_type: Type[Any] = JOKER, required_ext: str = JOKER) \
+        -> Tuple[Tuple[List[Parser], List[Parser], List[Parser]],
+                 List[Parser], List[Parser], List[Parser]]:
+        """
+        Implementation of find_all_matching_parsers, without cache.
+
         :param strict:
         :param desired_type: the type of object to match.
         :param required_ext: the required extension.
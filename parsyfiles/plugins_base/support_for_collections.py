@@ -5,7 +5,7 @@ from typing import Dict, Any, List, Union, Type, Set, Tuple, Callable, AbstractS
 
 from parsyfiles import GLOBAL_CONFIG
 from parsyfiles.converting_core import Converter, ConverterFunction
-from parsyfiles.filesystem_mapping import PersistedObject, FolderAndFilesStructureError
+from parsyfiles.filesystem_mapping import PersistedObject, FolderAndFilesStructureError, LazyMultifileChildren
 from parsyfiles.parsing_core import SingleFileParserFunction, AnyParser, MultiFileParser, ParsingPlan, T
 from parsyfiles.parsing_registries import ParserFinder, ConversionFinder
 from parsyfiles.type_inspection_tools import _extract_collection_base_type, get_pretty_type_str, get_base_generic_type, \
@@ -292,19 +292,36 @@ class MultifileCollectionParser(MultiFileParser):
             # -- repeat the subtype n times
             subtypes = [subtypes] * n_children
 
+        children_on_fs = obj_on_fs.get_multifile_children()
+        if isinstance(children_on_fs, LazyMultifileChildren):
+            # -- lazy scan mode: the children will be scanned and their plan created only when first needed
+            children_types = dict(zip(sorted(children_on_fs.keys()), subtypes))
+            return LazyDictionary(sorted(children_on_fs.keys()),
+                                  loading_method=lambda child_name: self._create_child_parsing_plan(
+                                      children_on_fs[child_name], children_types[child_name], logger))
+
         # -- for each child create a plan with the appropriate parser
         children_plan = OrderedDict()
         # use sorting for reproducible results in case of multiple errors
-        for (child_name, child_fileobject), child_typ in zip(sorted(obj_on_fs.get_multifile_children().items()),
-                                                           subtypes):
-            # -- use the parserfinder to find the plan
-            t, child_parser = self.parser_finder.build_parser_for_fileobject_and_desiredtype(child_fileobject, 
-                                                                                             child_typ, logger)
-            children_plan[child_name] = child_parser.create_parsing_plan(t, child_fileobject, logger,
-                                                                         _main_call=False)
+        for (child_name, child_fileobject), child_typ in zip(sorted(children_on_fs.items()), subtypes):
+            children_plan[child_name] = self._create_child_parsing_plan(child_fileobject, child_typ, logger)
 
         return children_plan
 
+    def _create_child_parsing_plan(self, child_fileobject: PersistedObject, child_typ: Type[Any], logger: Logger) \
+            -> ParsingPlan:
+        """
+        Uses the ParserFinder to find the appropriate parser for a child, and creates the corresponding parsing plan
+
+        :param child_fileobject:
+        :param child_typ:
+        :param logger:
+        :return:
+        """
+        t, child_parser = self.parser_finder.build_parser_for_fileobject_and_desiredtype(child_fileobject,
+                                                                                         child_typ, logger)
+        return child_parser.create_parsing_plan(t, child_fileobject, logger, _main_call=False)
+
     def options_hints(self):
         return self.get_id_for_options() + ': \n' \
                ' -- \'lazy_parsing\': a boolean indicating if parsing should be done later, when the item is actually ' \
@@ -8,7 +8,7 @@ from typing import Type, Any, List, Dict, Union
 from parsyfiles import GLOBAL_CONFIG
 from parsyfiles.converting_core import Converter, ConverterFunction, AnyObject, S, T, is_any_type, JOKER
 from parsyfiles.filesystem_mapping import PersistedObject
-from parsyfiles.parsing_core import MultiFileParser, AnyParser, SingleFileParserFunction
+from parsyfiles.parsing_core import MultiFileParser, AnyParser, SingleFileParserFunction, STREAM_BUFFER
 from parsyfiles.parsing_registries import ParserFinder, ConversionFinder
 from parsyfiles.plugins_base.support_for_collections import DictOfDict
 from parsyfiles.type_inspection_tools import get_pretty_type_str, get_constructor_attributes_types, \
@@ -18,26 +18,23 @@ from parsyfiles.var_checker import check_var
 from parsyfiles.log_utils import default_logger
 
 
-def read_object_from_pickle(desired_type: Type[T], file_path: str, encoding: str,
-                            fix_imports: bool = True, errors: str = 'strict', *args, **kwargs) -> Any:
+def read_object_from_pickle(desired_type: Type[T], file_buffer: bytes, logger: Logger, fix_imports: bool = True,
+                            encoding: str = 'utf-8', errors: str = 'strict', *args, **kwargs) -> Any:
     """
-    Parses a pickle file.
+    Parses a pickle file, from its memory-mapped contents.
 
     :param desired_type:
-    :param file_path:
-    :param encoding:
+    :param file_buffer: a read-only bytes-like object with the file contents
+    :param logger:
     :param fix_imports:
+    :param encoding: the encoding used to decode 8-bit string instances pickled by Python 2
     :param errors:
     :param args:
     :param kwargs:
     :return:
     """
     import pickle
-    file_object = open(file_path, mode='rb')
-    try:
-        return pickle.load(file_object, fix_imports=fix_imports, encoding=encoding, errors=errors)
-    finally:
-        file_object.close()
+    return pickle.loads(file_buffer, fix_imports=fix_imports, encoding=encoding, errors=errors)
 
 
 class b64str(metaclass=ABCMeta):
@@ -514,7 +511,7 @@ def get_default_object_parsers(parser_finder: ParserFinder, conversion_finder: C
     :return:
     """
     return [SingleFileParserFunction(parser_function=read_object_from_pickle,
-                                     streaming_mode=False,
+                                     streaming_mode=True, stream_type=STREAM_BUFFER,
                                      supported_exts={'.pyc'},
                                      supported_types={AnyObject}),
             MultifileObjectParser(parser_finder, conversion_finder)
@@ -547,6 +544,9 @@ class MultifileObjectParser(MultiFileParser):
     This class is able to read any non-collection type as long as they are PEP484 specified, from
     multifile objects. It simply inspects the required type to find the names and types of its constructor arguments.
     Then it relies on a ParserFinder to parse each of them before creating the final object.
+
+    Children are only accessed by attribute name: if the file mapping configuration has lazy_scan enabled, only the
+    children corresponding to constructor attributes are therefore scanned (type-directed scan).
     """
 
     def __init__(self, parser_finder: ParserFinder, conversion_finder: ConversionFinder):
@@ -658,8 +658,9 @@ class MultifileObjectParser(MultiFileParser):
             attribute_is_mandatory = att_desc[1]
             attribute_type = att_desc[0]
 
-            # get the child
-            if attribute_name in children_on_fs.keys():
+            # get the child. Note: only the children that are needed are accessed, so that in lazy scan mode the
+            # other ones are never scanned
+            if attribute_name in children_on_fs:
                 child_on_fs = children_on_fs[attribute_name]
 
                 # find a parser
@@ -0,0 +1,50 @@
+"""
+Measures the memory used per file by the PersistedObject tree and by the parsing plan tree, for a collection of small
+text files. Run with
+
+    python memory_per_node.py [nb_files]
+"""
+import sys
+import tracemalloc
+from logging import getLogger, WARNING
+from tempfile import TemporaryDirectory
+from typing import Dict
+
+from parsyfiles import WrappedFileMappingConfiguration
+from parsyfiles.parsing_fw import get_default_parser
+
+
+def measure(nb_files: int):
+    with TemporaryDirectory() as root:
+        # a collection of items, each made of two small text files
+        for i in range(nb_files // 2):
+            for name in ('a', 'b'):
+                with open(root + '/item' + str(i) + '_' + name + '.txt', 'w') as f:
+                    f.write(name)
+        nb_nodes = nb_files + 1
+
+        parser = get_default_parser()
+        logger = getLogger('parsyfiles_memory')
+        logger.setLevel(WARNING)
+        conf = WrappedFileMappingConfiguration()
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        obj = conf.create_persisted_object(root, logger=logger)
+        after_scan = tracemalloc.take_snapshot()
+        pp = parser.create_parsing_plan(Dict[str, str], obj, logger=logger)
+        after_plan = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        scan_bytes = sum(s.size_diff for s in after_scan.compare_to(before, 'filename'))
+        plan_bytes = sum(s.size_diff for s in after_plan.compare_to(after_scan, 'filename'))
+        print('{} nodes'.format(nb_nodes))
+        print('  persisted objects: {:.0f} bytes/node'.format(scan_bytes / nb_nodes))
+        print('  parsing plans:     {:.0f} bytes/node'.format(plan_bytes / nb_nodes))
+
+        # keep the trees alive until the measures are done
+        return obj, pp
+
+
+if __name__ == '__main__':
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -61,6 +61,8 @@ def test_deep_copy(root_parser: RootParser):
 def test_get_all_parsers(root_parser: RootParser):
     """ Tests that the default parsers are there and that their number is correct """
 
+    # the reference includes the lazy plugins
+    root_parser.load_lazy_plugins()
     parsers = root_parser.get_all_parsers(strict_type_matching=False)
     print('\n' + str(len(parsers)) + ' Root parser parsers:')
     pprint(parsers)
@@ -82,6 +84,8 @@ def test_option_hints(root_parser: RootParser):
 def test_get_all_conversion_chains(root_parser: RootParser):
     """ Tests that the default conversion chains are there and that their number is correct """
 
+    # the reference includes the lazy plugins
+    root_parser.load_lazy_plugins()
     chains = root_parser.get_all_conversion_chains()
     print('\n' + str(len(chains[0])) + '(generic) + ' + str(len(chains[2])) + '(specific) Root parser converters:')
     pprint(chains)
@@ -114,6 +118,8 @@ def test_get_all_supported_exts(root_parser: RootParser):
 def test_get_all_supported_types_pretty_str(root_parser: RootParser):
     """ Tests that the declared supported types are there and that their number is correct """
     
+    # the reference includes the lazy plugins
+    root_parser.load_lazy_plugins()
     t = root_parser.get_all_supported_types_pretty_str()
     print('\n' + str(len(t)) + ' Root parser supported types:')
     pprint(t)
@@ -125,6 +131,8 @@ def test_get_all_supported_types_pretty_str(root_parser: RootParser):
 def test_print_and_get_capabilities_by_ext(root_parser: RootParser):
     """ Tests that the declared capabilities by extension are correct """
 
+    # the reference includes the lazy plugins
+    root_parser.load_lazy_plugins()
     c = root_parser.get_capabilities_by_ext(strict_type_matching=False)
     print('\n' + str(len(c)) + ' Root parser capabilities by ext:')
     assert len(c) == 13
@@ -140,6 +148,8 @@ def test_print_and_get_capabilities_by_ext(root_parser: RootParser):
 def test_print_and_get_capabilities_by_type(root_parser: RootParser):
     """ Tests that the declared capabilities by type are correct """
 
+    # the reference includes the lazy plugins
+    root_parser.load_lazy_plugins()
     c = root_parser.get_capabilities_by_type(strict_type_matching=False)
     print('\n' + str(len(c)) + ' Root parser capabilities by type:')
     assert len(c) == 15
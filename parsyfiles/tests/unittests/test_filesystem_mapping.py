@@ -0,0 +1,344 @@
+import re
+from logging import getLogger
+from os.path import join
+from threading import current_thread, Event, Thread
+from time import sleep
+from typing import Dict
+
+import pytest
+
+from parsyfiles import parse_item, parse_collection, ArchiveFileSource, InMemoryFileSource
+
+from parsyfiles.filesystem_mapping import WrappedFileMappingConfiguration, FlatFileMappingConfiguration, \
+    DirectorySnapshot, MULTIFILE_EXT, ObjectPresentMultipleTimesOnFileSystemError, LazyMultifileChildren
+
+
+def _create_files(root_dir, relative_paths):
+    """ Creates empty files (and their parent folders) under root_dir """
+    for relative_path in relative_paths:
+        root_dir.join(relative_path).ensure()
+
+
+@pytest.fixture
+def wrapped_tree(tmpdir):
+    _create_files(tmpdir, ['root/a.txt', 'root/b.cfg', 'root/c/x.json', 'root/c/y.txt', 'root/d/e/z.yaml'])
+    tmpdir.join('root/empty').ensure(dir=True)
+    return str(tmpdir.join('root'))
+
+
+@pytest.fixture
+def flat_tree(tmpdir):
+    _create_files(tmpdir, ['root/a.txt', 'root/b.cfg', 'root/c--x.json', 'root/c--y.txt', 'root/d--e--z.yaml'])
+    return str(tmpdir.join('root'))
+
+
+@pytest.fixture
+def listed_folders(monkeypatch):
+    """ Records the folders listed by DirectorySnapshot.create """
+    listed = []
+    original_create = DirectorySnapshot.create
+
+    def create_and_record(dir_path):
+        listed.append(dir_path)
+        return original_create(dir_path)
+
+    monkeypatch.setattr(DirectorySnapshot, 'create', staticmethod(create_and_record))
+    return listed
+
+
+def test_wrapped_each_folder_listed_once(wrapped_tree, listed_folders):
+    """ Checks that during a scan with the wrapped mapping, each folder is listed only once """
+
+    obj = WrappedFileMappingConfiguration().create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+
+    assert len(listed_folders) == len(set(listed_folders))
+    assert obj.ext == MULTIFILE_EXT
+    assert sorted(obj.get_multifile_children().keys()) == ['a', 'b', 'c', 'd', 'empty']
+    assert obj.get_multifile_children()['a'].get_singlefile_path() == join(wrapped_tree, 'a.txt')
+    assert sorted(obj.get_multifile_children()['c'].get_multifile_children().keys()) == ['x', 'y']
+    assert obj.get_multifile_children()['empty'].get_multifile_children() == dict()
+
+
+def test_flat_folder_listed_once(flat_tree, listed_folders):
+    """ Checks that during a scan with the flat mapping, the folder is listed only once """
+
+    obj = FlatFileMappingConfiguration(separator='--').create_persisted_object(flat_tree, getLogger('parsyfiles'))
+
+    assert len(listed_folders) == len(set(listed_folders))
+    assert flat_tree in listed_folders
+    assert sorted(obj.get_multifile_children().keys()) == ['a', 'b', 'c', 'd']
+    assert sorted(obj.get_multifile_children()['c'].get_multifile_children().keys()) == ['x', 'y']
+    assert obj.get_multifile_children()['d'].get_multifile_children()['e'].get_multifile_children()['z']\
+               .get_singlefile_path() == join(flat_tree, 'd--e--z.yaml')
+
+
+def test_wrapped_present_multiple_times(tmpdir):
+    """ Checks that an object present with several extensions is still detected """
+    _create_files(tmpdir, ['root/a.txt', 'root/a.cfg'])
+
+    with pytest.raises(ObjectPresentMultipleTimesOnFileSystemError):
+        WrappedFileMappingConfiguration().create_persisted_object(str(tmpdir.join('root')), getLogger('parsyfiles'))
+
+
+def test_manifest_only_lists_modified_folders(wrapped_tree, tmpdir, listed_folders):
+    """ Checks that with a manifest, the folders that did not change are not listed again in the next scans """
+
+    # make all folders look 'old' so that the manifest entries are trusted
+    manifest_file = str(tmpdir.join('cache').ensure(dir=True).join('manifest.json'))
+    for folder in [tmpdir.join('root'), tmpdir.join('root/c'), tmpdir.join('root/d'), tmpdir.join('root/d/e'),
+                   tmpdir.join('root/empty'), tmpdir]:
+        folder.setmtime(1000000)
+
+    first = WrappedFileMappingConfiguration(manifest_file=manifest_file)\
+        .create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+    assert len(listed_folders) > 0
+
+    # a new mapping configuration (as in a new process) with the same manifest does not list anything
+    del listed_folders[:]
+    second = WrappedFileMappingConfiguration(manifest_file=manifest_file)\
+        .create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+    assert listed_folders == []
+    assert sorted(second.get_multifile_children().keys()) == sorted(first.get_multifile_children().keys())
+
+    # modify one folder: only this one is listed again
+    tmpdir.join('root/c/w.txt').ensure()
+    tmpdir.join('root/c').setmtime(2000000)
+    third = WrappedFileMappingConfiguration(manifest_file=manifest_file)\
+        .create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+    assert listed_folders == [join(wrapped_tree, 'c')]
+    assert sorted(third.get_multifile_children()['c'].get_multifile_children().keys()) == ['w', 'x', 'y']
+
+
+def test_manifest_with_scan_threads(wrapped_tree, tmpdir, listed_folders):
+    """ Checks that the folders listed by parallel scans are all recorded in the manifest """
+    cache = tmpdir.join('cache').ensure(dir=True)
+    manifest_file = str(cache.join('manifest.json'))
+    for folder in [tmpdir.join('root'), tmpdir.join('root/c'), tmpdir.join('root/d'), tmpdir.join('root/d/e'),
+                   tmpdir.join('root/empty'), tmpdir]:
+        folder.setmtime(1000000)
+
+    WrappedFileMappingConfiguration(manifest_file=manifest_file, scan_threads=4)\
+        .create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+    assert [f.basename for f in cache.listdir()] == ['manifest.json']
+
+    del listed_folders[:]
+    WrappedFileMappingConfiguration(manifest_file=manifest_file, scan_threads=4)\
+        .create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+    assert listed_folders == []
+
+
+def test_lazy_scan_and_lazy_parsing(tmpdir, listed_folders):
+    """ Checks that with lazy scan and lazy parsing, reading one item of a collection only lists the folder of that
+    item """
+
+    for i in range(5):
+        tmpdir.join('root/item' + str(i)).ensure(dir=True).join('a.txt').write('hello' + str(i))
+    root = str(tmpdir.join('root'))
+
+    res = parse_collection(root, Dict[str, str], file_mapping_conf=WrappedFileMappingConfiguration(lazy_scan=True),
+                           lazy_mfcollection_parsing=True)
+
+    assert len(res) == 5
+    assert not any(folder.startswith(join(root, 'item')) for folder in listed_folders)
+    assert res['item3']['a'] == 'hello3'
+    assert [folder for folder in listed_folders if folder.startswith(join(root, 'item'))] == [join(root, 'item3')]
+
+
+def test_lazy_scan_children(wrapped_tree):
+    """ Checks that in lazy scan mode the children are only created when accessed """
+    obj = WrappedFileMappingConfiguration(lazy_scan=True).create_persisted_object(wrapped_tree, getLogger('parsyfiles'))
+    children = obj.get_multifile_children()
+
+    assert isinstance(children, LazyMultifileChildren)
+    assert sorted(children.keys()) == ['a', 'b', 'c', 'd', 'empty']
+    assert 'c' in children and not children.is_loaded('c')
+    assert sorted(children['c'].get_multifile_children().keys()) == ['x', 'y']
+    assert children.is_loaded('c') and not children.is_loaded('d')
+
+
+def _get_tree_structure(obj):
+    """ Returns a comparable representation of a PersistedObject tree """
+    if obj.is_singlefile:
+        return obj.get_singlefile_path()
+    else:
+        return {name: _get_tree_structure(child) for name, child in obj.get_multifile_children().items()}
+
+
+def test_parallel_scan(tmpdir, monkeypatch):
+    """ Checks that the parallel scan mode produces the same tree and errors than the sequential one, on a
+    slowed-down filesystem """
+
+    _create_files(tmpdir, ['root/item' + str(i) + '/sub' + str(j) + '/a.txt' for i in range(4) for j in range(3)])
+    root = str(tmpdir.join('root'))
+
+    threads_used = set()
+    original_create = DirectorySnapshot.create
+
+    def slow_create(dir_path):
+        threads_used.add(current_thread().name)
+        sleep(0.02)
+        return original_create(dir_path)
+
+    monkeypatch.setattr(DirectorySnapshot, 'create', staticmethod(slow_create))
+
+    sequential = WrappedFileMappingConfiguration().create_persisted_object(root, getLogger('parsyfiles'))
+    threads_used.clear()
+    parallel = WrappedFileMappingConfiguration(scan_threads=4).create_persisted_object(root, getLogger('parsyfiles'))
+
+    assert len(threads_used) > 1
+    assert _get_tree_structure(parallel) == _get_tree_structure(sequential)
+
+    # same errors
+    tmpdir.join('root/item2/sub1/a.cfg').ensure()
+    with pytest.raises(ObjectPresentMultipleTimesOnFileSystemError):
+        WrappedFileMappingConfiguration(scan_threads=4).create_persisted_object(root, getLogger('parsyfiles'))
+
+
+def test_shared_configuration_threads(tmpdir, monkeypatch):
+    """ Checks that a configuration shared by several threads does not reuse the folders listed by another scan """
+    _create_files(tmpdir, ['root/a.txt', 'root/c/x.txt'])
+    root = str(tmpdir.join('root'))
+    conf = WrappedFileMappingConfiguration()
+
+    # the scan of the other thread lists the root folder, then waits while listing 'c'
+    other_thread_waiting, release_other_thread = Event(), Event()
+    original_create = DirectorySnapshot.create
+
+    def blocking_create(dir_path):
+        if current_thread().name == 'other' and dir_path.endswith('c'):
+            other_thread_waiting.set()
+            release_other_thread.wait(10)
+        return original_create(dir_path)
+
+    monkeypatch.setattr(DirectorySnapshot, 'create', staticmethod(blocking_create))
+    other = Thread(name='other', target=lambda: conf.create_persisted_object(root, getLogger('parsyfiles')))
+    other.start()
+    try:
+        assert other_thread_waiting.wait(10)
+        tmpdir.join('root/b.txt').ensure()
+        obj = conf.create_persisted_object(root, getLogger('parsyfiles'))
+        assert sorted(obj.get_multifile_children().keys()) == ['a', 'b', 'c']
+    finally:
+        release_other_thread.set()
+        other.join()
+
+
+def test_snapshot_prefix_index():
+    """ Checks the bisection-based prefix search of DirectorySnapshot """
+    snapshot = DirectorySnapshot('.', ['b--x.txt', 'a.txt', 'b.cfg', 'b--y--z.txt', 'ba.txt', 'c'], [])
+
+    assert snapshot.get_file_names_with_prefix('b--') == ['b--x.txt', 'b--y--z.txt']
+    assert snapshot.get_file_names_with_prefix('b') == ['b--x.txt', 'b--y--z.txt', 'b.cfg', 'ba.txt']
+    assert snapshot.get_file_names_with_prefix('d') == []
+    assert len(snapshot.get_file_names_with_prefix('')) == 6
+    assert snapshot.has_file('c') and not snapshot.has_file('b')
+    assert snapshot.get_file_exts_for_stem('b') == {'.cfg': 'b.cfg'}
+
+
+@pytest.fixture
+def archived_items(tmpdir):
+    """ Creates a zip archive with a wrapped tree, a tar.gz archive with a flat tree """
+    import tarfile
+    import zipfile
+
+    zip_path = str(tmpdir.join('items.zip'))
+    with zipfile.ZipFile(zip_path, 'w') as zf:
+        for i in range(3):
+            zf.writestr('data/item' + str(i) + '/a.txt', 'hello' + str(i))
+        zf.writestr('data/empty/', '')
+
+    _create_files(tmpdir, ['flat/item0--a.txt', 'flat/item1--a.txt'])
+    tmpdir.join('flat/item0--a.txt').write('flat0')
+    tmpdir.join('flat/item1--a.txt').write('flat1')
+    tar_path = str(tmpdir.join('items.tar.gz'))
+    with tarfile.open(tar_path, 'w:gz') as tf:
+        tf.add(str(tmpdir.join('flat')), arcname='flat')
+
+    return zip_path, tar_path
+
+
+def test_archive_file_source(archived_items):
+    """ Checks that collections can be parsed from zip and tar archives, with the wrapped and flat mappings """
+    zip_path, tar_path = archived_items
+
+    zip_source = ArchiveFileSource(zip_path)
+    res = parse_collection('data', Dict[str, str],
+                           file_mapping_conf=WrappedFileMappingConfiguration(file_source=zip_source))
+    assert res == {'item0': {'a': 'hello0'}, 'item1': {'a': 'hello1'}, 'item2': {'a': 'hello2'}, 'empty': dict()}
+    zip_source.close()
+
+    tar_source = ArchiveFileSource(tar_path)
+    res = parse_collection('flat', Dict[str, str],
+                           file_mapping_conf=FlatFileMappingConfiguration(separator='--', file_source=tar_source))
+    assert res == {'item0': {'a': 'flat0'}, 'item1': {'a': 'flat1'}}
+    tar_source.close()
+
+    with pytest.raises(ValueError):
+        WrappedFileMappingConfiguration(file_source=ArchiveFileSource(zip_path), manifest_file='manifest.json')
+
+
+def test_in_memory_file_source(monkeypatch):
+    """ Checks that collections can be parsed from in-memory files, without listing any folder """
+
+    def fail_create(dir_path):
+        raise AssertionError('the filesystem should not be listed')
+
+    monkeypatch.setattr(DirectorySnapshot, 'create', staticmethod(fail_create))
+
+    files = {'data/item0/a.txt': 'hello0', 'data/item1/a.txt': 'hello1'.encode('utf-8'), 'data/empty/': None,
+             'flat/item0--a.txt': 'flat0'}
+    source = InMemoryFileSource(files)
+    res = parse_collection('data', Dict[str, str], file_mapping_conf=WrappedFileMappingConfiguration(file_source=source))
+    assert res == {'item0': {'a': 'hello0'}, 'item1': {'a': 'hello1'}, 'empty': dict()}
+
+    res = parse_collection('flat', Dict[str, str],
+                           file_mapping_conf=FlatFileMappingConfiguration(separator='--', file_source=source))
+    assert res == {'item0': {'a': 'flat0'}}
+
+
+def test_scan_filters(tmpdir, listed_folders):
+    """ Checks that excluded folders are never listed, and that excluded files create no conflict """
+    _create_files(tmpdir, ['root/a.txt', 'root/a.txt.bak', 'root/b.cfg', 'root/b.bak', 'root/.git/config',
+                           'root/.git/objects/x', 'root/c/x.json', 'root/c/y.txt'])
+    root = str(tmpdir.join('root'))
+
+    obj = WrappedFileMappingConfiguration(exclude=['.git', '*.bak']).create_persisted_object(root, getLogger('parsyfiles'))
+    assert sorted(obj.get_multifile_children().keys()) == ['a', 'b', 'c']
+    assert obj.get_multifile_children()['b'].ext == '.cfg'
+    assert not any('.git' in folder for folder in listed_folders)
+
+    obj = WrappedFileMappingConfiguration(include=['*.txt'], exclude=[re.compile(r'\..*')], scan_threads=2)\
+        .create_persisted_object(root, getLogger('parsyfiles'))
+    assert sorted(obj.get_multifile_children().keys()) == ['a', 'c']
+    assert sorted(obj.get_multifile_children()['c'].get_multifile_children().keys()) == ['y']
+
+    # flat mode
+    _create_files(tmpdir, ['flat/c--x.json', 'flat/c--x.json~', 'flat/c--y.txt'])
+    obj = FlatFileMappingConfiguration(separator='--', exclude='*~')\
+        .create_persisted_object(str(tmpdir.join('flat')), getLogger('parsyfiles'))
+    assert sorted(obj.get_multifile_children()['c'].get_multifile_children().keys()) == ['x', 'y']
+
+
+class _Child(object):
+    def __init__(self, x: int):
+        self.x = x
+
+
+class _Parent(object):
+    def __init__(self, a: str, b: _Child, c: int = 0):
+        self.a = a
+        self.b = b
+        self.c = c
+
+
+def test_type_directed_scan(tmpdir, listed_folders):
+    """ Checks that in lazy scan mode, parsing an object only scans the children that are constructor attributes """
+    tmpdir.join('root/a.txt').ensure().write('hello')
+    tmpdir.join('root/b/x.txt').ensure().write('12')
+    # unrelated siblings, including an object present twice
+    _create_files(tmpdir, ['root/junk/deep/z.txt', 'root/junk/deep/z.cfg', 'root/other/q.txt'])
+    root = str(tmpdir.join('root'))
+
+    res = parse_item(root, _Parent, file_mapping_conf=WrappedFileMappingConfiguration(lazy_scan=True))
+    assert (res.a, res.b.x, res.c) == ('hello', 12, 0)
+    assert [folder for folder in listed_folders if folder.startswith(root)] == [root, join(root, 'b')]
@@ -0,0 +1,89 @@
+from logging import getLogger
+from typing import Union
+
+from parsyfiles import RootParser, parsyfiles_global_config, WrappedFileMappingConfiguration
+from parsyfiles.parsing_combining_parsers import CascadeStats, CascadingParser, using_cascade_stats
+from parsyfiles.parsing_core import SingleFileParserFunction
+import parsyfiles.parsing_combining_parsers as parsing_combining_parsers
+
+
+def test_adaptive_cascades(tmpdir):
+    """ Checks that adaptive cascades record the outcomes of their parsers and try the most successful first """
+    tmpdir.join('a.txt').write('abc')
+    tmpdir.join('b.txt').write('12')
+    logger = getLogger('parsyfiles')
+    parser = RootParser(logger=logger)
+
+    assert parser.parse_item(str(tmpdir.join('b')), Union[int, str]) == 12
+    assert parser.get_cascade_stats() == dict()
+
+    parsyfiles_global_config(adaptive_cascades=True)
+    try:
+        assert parser.parse_item(str(tmpdir.join('a')), Union[int, str]) == 'abc'
+        stats = parser.get_cascade_stats()[(Union[int, str], '.txt')]
+        assert [outcomes for (typ, p), outcomes in stats.items() if typ is int] == [(0, 1)]
+        assert [outcomes for (typ, p), outcomes in stats.items() if typ is str] == [(1, 0)]
+
+        # str now comes first, but only for this parser
+        assert parser.parse_item(str(tmpdir.join('b')), Union[int, str]) == '12'
+        other = RootParser(logger=logger)
+        assert other.get_cascade_stats() == dict()
+        assert other.parse_item(str(tmpdir.join('b')), Union[int, str]) == 12
+
+        parser.clear_cascade_stats()
+        assert parser.parse_item(str(tmpdir.join('b')), Union[int, str]) == 12
+    finally:
+        parsyfiles_global_config(adaptive_cascades=False)
+
+
+def test_cascade_stats_size(monkeypatch):
+    """ Checks that the cascade stats only remember the most recently used desired types and extensions """
+    monkeypatch.setattr(parsing_combining_parsers, 'CASCADE_STATS_SIZE', 2)
+    stats = CascadeStats()
+    for ext in ('.a', '.b', '.a', '.c'):
+        stats.record(int, ext, None, 'parser', success=True)
+    assert sorted(stats.get_all().keys()) == [(int, '.a'), (int, '.c')]
+
+
+class _FailingParser(SingleFileParserFunction):
+    """ A parser that always fails to create a parsing plan """
+    def _create_parsing_plan(self, desired_type, filesystem_object, logger, log_only_last=False):
+        raise ValueError('no plan')
+
+
+def test_adaptive_cascades_resort_at_execution(tmpdir):
+    """ Checks that when a cascade is sorted again at execution time, the parsers that failed to create a parsing plan
+    are neither tried nor recorded again """
+    tmpdir.join('a.txt').write('abc')
+    logger = getLogger('parsyfiles')
+    obj = WrappedFileMappingConfiguration().create_persisted_object(str(tmpdir.join('a')), logger)
+
+    def read_str(prefix):
+        return lambda desired_type, stream, logger, **kwargs: prefix + stream.read()
+
+    failing = _FailingParser(read_str('failing'), supported_types={str}, supported_exts={'.txt'})
+    first = SingleFileParserFunction(read_str('first '), supported_types={str}, supported_exts={'.txt'},
+                                     custom_name='first')
+    second = SingleFileParserFunction(read_str('second '), supported_types={str}, supported_exts={'.txt'},
+                                      custom_name='second')
+    cascade = CascadingParser([failing, first, second])
+    stats = CascadeStats()
+
+    # the failing parser succeeded for other files, so it is tried first
+    for _ in range(5):
+        stats.record(str, '.txt', None, failing, success=True)
+
+    parsyfiles_global_config(adaptive_cascades=True)
+    try:
+        with using_cascade_stats(stats):
+            plan = cascade.create_parsing_plan(str, obj, logger)
+        assert stats.get_all()[(str, '.txt')] == {(None, failing): (5, 1)}
+
+        # the first parser failed meanwhile for other files of a collection: the second one is now preferred to it
+        for _ in range(3):
+            stats.record(str, '.txt', None, first, success=False)
+        assert plan.execute(logger, options=dict()) == 'second abc'
+        assert stats.get_all()[(str, '.txt')] == {(None, failing): (5, 1), (None, first): (0, 3),
+                                                   (None, second): (1, 0)}
+    finally:
+        parsyfiles_global_config(adaptive_cascades=False)
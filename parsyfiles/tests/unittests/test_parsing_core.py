@@ -0,0 +1,46 @@
+import pickle
+
+import pytest
+
+from parsyfiles import parse_item, InMemoryFileSource, WrappedFileMappingConfiguration
+from parsyfiles.filesystem_mapping import singlefile_buffer
+from parsyfiles.parsing_core import SingleFileParserFunction, STREAM_BINARY, STREAM_BUFFER
+from parsyfiles.parsing_fw import RootParser
+
+
+def test_pickle_from_buffer(tmpdir):
+    """ Checks that pickle files are parsed from a buffer, both on the filesystem and in memory """
+    tmpdir.join('obj.pyc').write_binary(pickle.dumps({'a': [1, 2]}))
+    assert parse_item(str(tmpdir.join('obj')), dict) == {'a': [1, 2]}
+
+    source = InMemoryFileSource({'obj.pyc': pickle.dumps({'b': 3})})
+    assert parse_item('obj', dict, file_mapping_conf=WrappedFileMappingConfiguration(file_source=source)) == {'b': 3}
+
+
+def test_singlefile_buffer(tmpdir):
+    """ Checks that local files are memory-mapped, including empty ones """
+    tmpdir.join('data.bin').write_binary(b'\x00\x01\x02')
+    with singlefile_buffer(str(tmpdir.join('data.bin'))) as buffer:
+        assert buffer[1:] == b'\x01\x02'
+
+    tmpdir.join('empty.bin').write_binary(b'')
+    with singlefile_buffer(str(tmpdir.join('empty.bin'))) as buffer:
+        assert len(buffer) == 0
+
+
+def read_bytes_header(desired_type, stream, logger, **kwargs):
+    return stream.read(2)
+
+
+def test_binary_stream_type(tmpdir):
+    """ Checks that parsers declared with STREAM_BINARY receive a binary stream """
+    tmpdir.join('data.bin').write_binary(b'\xff\xfe\x00')
+
+    parser = RootParser()
+    parser.register_parser(SingleFileParserFunction(read_bytes_header, supported_types={bytes},
+                                                    supported_exts={'.bin'}, stream_type=STREAM_BINARY))
+    assert parser.parse_item(str(tmpdir.join('data')), bytes) == b'\xff\xfe'
+
+    with pytest.raises(ValueError):
+        SingleFileParserFunction(read_bytes_header, supported_types={bytes}, supported_exts={'.bin'},
+                                 streaming_mode=False, stream_type=STREAM_BUFFER)
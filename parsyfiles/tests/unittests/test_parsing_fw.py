@@ -0,0 +1,53 @@
+import pickle
+
+import pytest
+
+from parsyfiles.parsing_core import SingleFileParserFunction
+from parsyfiles.parsing_fw import RootParser, save_parser_snapshot, load_parser_snapshot, ParserSnapshotMismatch, \
+    DefaultRootParser, use_default_parser_snapshot
+import parsyfiles.parsing_fw as parsing_fw
+from parsyfiles.tests.unittests.test_parsing_registries import _Foo, read_foo
+
+
+def test_parser_snapshot(tmpdir, monkeypatch):
+    """ Checks that a root parser saved to a snapshot can be loaded and used, unless the versions changed """
+    parser = RootParser()
+    parser.register_parser(SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'}))
+    snapshot_file = str(tmpdir.join('parsers.snapshot'))
+    save_parser_snapshot(parser, snapshot_file)
+
+    loaded = load_parser_snapshot(snapshot_file)
+    assert [str(p) for p in loaded.get_all_parsers()] == [str(p) for p in parser.get_all_parsers()]
+    assert len(loaded.get_all_conversion_chains()[2]) == len(parser.get_all_conversion_chains()[2])
+    tmpdir.join('a.foo').write('12')
+    assert loaded.parse_item(str(tmpdir.join('a')), _Foo).a == 12
+
+    # the multifile parsers of the loaded parser look for their children's parsers in it
+    assert all(p.parser_finder is loaded for p in loaded._generic_parsers if hasattr(p, 'parser_finder'))
+
+    # another version of a dependency
+    versions = parsing_fw._get_plugins_versions()
+    versions['yaml'] = 'other'
+    monkeypatch.setattr(parsing_fw, '_get_plugins_versions', lambda: versions)
+    with pytest.raises(ParserSnapshotMismatch):
+        load_parser_snapshot(snapshot_file)
+
+
+def test_parser_snapshot_invalid(tmpdir, monkeypatch):
+    """ Checks that invalid snapshots are not loaded, and that snapshots that can not be saved leave no file """
+    snapshot_file = str(tmpdir.join('parsers.snapshot'))
+    with open(snapshot_file, 'wb') as f:
+        pickle.dump(1, f)
+    with pytest.raises(ParserSnapshotMismatch):
+        load_parser_snapshot(snapshot_file)
+
+    # the default parser is built instead, and the snapshot can not be saved since it contains a lambda
+    monkeypatch.setattr(DefaultRootParser, '_instance', None)
+    monkeypatch.setattr(parsing_fw, 'register_default_plugins', lambda root_parser: root_parser.register_parser(
+        SingleFileParserFunction(lambda desired_type, stream, logger, **kwargs: _Foo(int(stream.read())),
+                                 supported_types={_Foo}, supported_exts={'.foo'})))
+    assert not use_default_parser_snapshot(snapshot_file)
+    assert DefaultRootParser._instance is not None
+    assert [f.basename for f in tmpdir.listdir()] == ['parsers.snapshot']
+    with pytest.raises(ParserSnapshotMismatch):
+        load_parser_snapshot(snapshot_file)
@@ -0,0 +1,273 @@
+from collections.abc import Sequence
+from logging import getLogger
+from typing import Union
+
+import pytest
+
+from parsyfiles import WrappedFileMappingConfiguration, parsyfiles_global_config
+from parsyfiles.converting_core import JOKER, ConverterFunction
+from parsyfiles.parsing_core import SingleFileParserFunction
+from parsyfiles.parsing_fw import RootParser, DefaultRootParser
+from parsyfiles.parsing_registries import ParserCache, ConverterCache, LazyPlugin
+
+
+class _Foo(object):
+    def __init__(self, a: int):
+        self.a = a
+
+
+def read_foo(desired_type, stream, logger, **kwargs):
+    return _Foo(int(stream.read()))
+
+
+def test_find_all_matching_parsers_cache():
+    """ Checks that the results of find_all_matching_parsers are cached, and invalidated when registering parsers """
+    parser = RootParser()
+
+    first = parser.find_all_matching_parsers(strict=False, desired_type=dict, required_ext='.json')
+    second = parser.find_all_matching_parsers(strict=False, desired_type=dict, required_ext='.json')
+    assert first == second
+    assert len(first[0][2]) > 0
+
+    # returned lists are copies
+    first[0][2].clear()
+    assert parser.find_all_matching_parsers(strict=False, desired_type=dict, required_ext='.json') == second
+
+    # registering a parser invalidates the cache
+    foo_parser = SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'})
+    assert foo_parser not in parser.find_all_matching_parsers(strict=False, desired_type=_Foo,
+                                                              required_ext='.foo')[0][2]
+    parser.register_parser(foo_parser)
+    assert foo_parser in parser.find_all_matching_parsers(strict=False, desired_type=_Foo, required_ext='.foo')[0][2]
+
+
+def test_find_all_matching_parsers_indexes():
+    """ Checks that the ext and type indexes of the parser cache yield the same results than asking all parsers """
+    parser = RootParser()
+    parser.register_parser(SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'}))
+
+    def ask_all_parsers(strict, desired_type, required_ext):
+        """ the classification done by each parser, without the indexes """
+        no_ext_match_but_type_match = [p for p in parser._generic_parsers
+                                       if not p.is_able_to_parse(desired_type, required_ext, strict)
+                                       and p.is_able_to_parse(desired_type, JOKER, strict)]
+        no_match = []
+        for p in parser._specific_parsers:
+            if not p.is_able_to_parse(desired_type, required_ext, strict) \
+                    and not p.is_able_to_parse(JOKER, required_ext, strict):
+                if p.is_able_to_parse(desired_type, JOKER, strict):
+                    no_ext_match_but_type_match.append(p)
+                else:
+                    no_match.append(p)
+        return no_ext_match_but_type_match, no_match
+
+    for strict in (True, False):
+        for desired_type in (JOKER, _Foo, str, dict, list, int):
+            for required_ext in (JOKER, '.foo', '.txt', '.unknown'):
+                res = ParserCache.find_all_matching_parsers(parser, strict, desired_type, required_ext)
+                assert (res[2], res[3]) == ask_all_parsers(strict, desired_type, required_ext)
+
+    # the foo parser does not support .txt but does support _Foo
+    res = ParserCache.find_all_matching_parsers(parser, True, _Foo, '.txt')
+    assert [p for p in res[2] if _Foo in p.supported_types] == [parser._specific_parsers[-1]]
+
+
+def test_built_parsers_cache(tmpdir):
+    """ Checks that the parsers built for files of the same shape are reused, until a new subclass is defined """
+    tmpdir.join('a.foo').write('1')
+    tmpdir.join('b.foo').write('2')
+    parser = RootParser()
+    parser.register_parser(SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'}))
+    conf = WrappedFileMappingConfiguration()
+    logger = getLogger('parsyfiles')
+
+    a = conf.create_persisted_object(str(tmpdir.join('a')), logger=logger)
+    b = conf.create_persisted_object(str(tmpdir.join('b')), logger=logger)
+    parser_a = parser.build_parser_for_fileobject_and_desiredtype(a, _Foo, logger=logger)
+    assert parser.build_parser_for_fileobject_and_desiredtype(b, _Foo, logger=logger) is parser_a
+
+    # a new subclass may have its own parsers, so the parser is built again
+    class _Bar(_Foo):
+        pass
+
+    assert parser.build_parser_for_fileobject_and_desiredtype(b, _Foo, logger=logger) is not parser_a
+
+
+def test_built_parsers_cache_union_order(tmpdir):
+    """ Checks that the order of the alternate types of a Union is respected although equal unions share the cache """
+    tmpdir.join('a.txt').write('12')
+    parser = RootParser()
+    assert parser.parse_item(str(tmpdir.join('a')), Union[str, int]) == '12'
+    assert parser.parse_item(str(tmpdir.join('a')), Union[int, str]) == 12
+
+
+
+def test_matching_parsers_cache_size():
+    """ Checks that the matching parsers found for a query are kept in a LRU cache of size parsers_cache_size """
+    parser = RootParser()
+    parser.register_parser(SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'}))
+    parsyfiles_global_config(parsers_cache_size=2)
+    try:
+        for ext in ('.a', '.foo', '.a', '.b'):
+            parser.find_all_matching_parsers(strict=True, desired_type=_Foo, required_ext=ext)
+        assert list(parser._matching_parsers_cache) == [(True, _Foo, '.a'), (True, _Foo, '.b')]
+    finally:
+        parsyfiles_global_config(parsers_cache_size=256)
+
+def test_conversion_chains_found_at_query_time():
+    """ Checks that the conversion chains are found lazily, including those enabled by a later registration """
+    registry = ConverterCache(strict_matching=True)
+    registry.register_converter(ConverterFunction(int, float, lambda desired_type, i, logger: float(i)))
+    assert [str(c) for c in registry.get_all_conversion_chains(from_type=str, to_type=float)[2]] == []
+
+    registry.register_converter(ConverterFunction(str, int, lambda desired_type, s, logger: int(s)))
+    chains = registry.get_all_conversion_chains(from_type=str, to_type=float)[2]
+    assert [len(c) for c in chains] == [2]
+    assert chains[0].convert(float, '12', getLogger('parsyfiles'), options={}) == 12.0
+
+
+def test_conversion_chains_index_non_strict():
+    """ Checks that the type indexes of the converter cache find converters of parent classes, including ABCs """
+    registry = ConverterCache(strict_matching=False)
+    registry.register_converter(ConverterFunction(Sequence, str, lambda desired_type, s, logger: ','.join(s)))
+    registry.register_converter(ConverterFunction(str, bool, lambda desired_type, s, logger: s == 'true'))
+
+    assert [len(c) for c in registry.get_all_conversion_chains(from_type=list, to_type=str)[2]] == [1]
+    assert [len(c) for c in registry.get_all_conversion_chains(from_type=list, to_type=int)[1]] == [2]
+    assert registry.get_all_conversion_chains(from_type=dict, to_type=str) == ([], [], [])
+
+
+def test_registration_batch():
+    """ Checks that queries made within a registration batch see the registered parsers, and the ones made after too """
+    parser = RootParser()
+    foo_parser = SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'})
+    assert parser.find_all_matching_parsers(strict=False, desired_type=_Foo, required_ext='.foo')[0][2] == []
+
+    with parser.registration_batch():
+        parser.register_parser(foo_parser)
+        assert parser.find_all_matching_parsers(strict=False, desired_type=_Foo,
+                                                required_ext='.foo')[0][2] == [foo_parser]
+        parser.register_converters([ConverterFunction(_Foo, int, lambda desired_type, foo, logger: foo.a)])
+
+    assert parser.find_all_matching_parsers(strict=False, desired_type=_Foo, required_ext='.foo')[0][2] == [foo_parser]
+    assert len(parser.find_all_matching_parsers(strict=False, desired_type=int, required_ext='.foo')[0][2]) == 1
+
+
+def test_root_parser_copy_on_write():
+    """ Checks that new root parsers share the default registry until something is registered on them """
+    parser = RootParser()
+    other = RootParser()
+    assert parser._specific_parsers is other._specific_parsers
+
+    foo_parser = SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'})
+    parser.register_parser(foo_parser)
+    assert parser._specific_parsers is not other._specific_parsers
+    assert foo_parser in parser.get_all_parsers()
+    assert foo_parser not in other.get_all_parsers()
+    assert foo_parser not in RootParser().get_all_parsers()
+
+    # the multifile parsers of the copy look for their children's parsers in the copy
+    assert all(p.parser_finder is parser for p in parser._generic_parsers if hasattr(p, 'parser_finder'))
+
+
+def register_foo_plugin(registry):
+    registry.register_parser(SingleFileParserFunction(read_foo, supported_types={_Foo}, supported_exts={'.foo'}))
+
+
+def test_lazy_plugins(tmpdir):
+    """ Checks that lazy plugins are listed, and only registered when one of their extensions or types is needed """
+    tmpdir.join('a.foo').write('1')
+    by_ext = RootParser(register_default_parsers=False)
+    by_ext.register_lazy_plugin(LazyPlugin('foo', register_foo_plugin, supported_exts={'.foo'},
+                                           supported_modules={'unknown_module'}))
+    assert by_ext.get_all_supported_exts() == {'.foo'}
+    assert by_ext.get_all_parsers() == []
+
+    assert by_ext.parse_item(str(tmpdir.join('a')), _Foo).a == 1
+    assert by_ext.get_lazy_plugins() == []
+    assert len(by_ext.get_all_parsers()) == 1
+
+    by_type = RootParser(register_default_parsers=False)
+    by_type.register_lazy_plugin(LazyPlugin('foo', register_foo_plugin, supported_exts=set(),
+                                            supported_modules={_Foo.__module__.split('.')[0]}))
+    assert by_type.find_all_matching_parsers(strict=False, desired_type=str, required_ext='.foo')[0][2] == []
+    assert len(by_type.find_all_matching_parsers(strict=False, desired_type=_Foo, required_ext='.foo')[0][2]) == 1
+
+
+def test_lazy_plugins_copy_on_write(tmpdir):
+    """ Checks that a lazy plugin declared on a root parser is not seen nor loaded by the other root parsers """
+    tmpdir.join('a.foo').write('1')
+    parser = RootParser()
+    other = RootParser()
+    parser.register_lazy_plugin(LazyPlugin('foo', register_foo_plugin, supported_exts={'.foo'},
+                                           supported_modules={'unknown_module'}))
+    assert '.foo' in parser.get_all_supported_exts()
+    assert '.foo' not in other.get_all_supported_exts()
+    assert '.foo' not in RootParser().get_all_supported_exts()
+
+    assert parser.parse_item(str(tmpdir.join('a')), _Foo).a == 1
+    assert all(p.supported_exts != {'.foo'} for p in other.get_all_parsers())
+    assert all(p.supported_exts != {'.foo'} for p in RootParser().get_all_parsers())
+
+
+def test_lazy_plugins_failed_registration():
+    """ Checks that a lazy plugin whose registration fails is not lost """
+    calls = []
+
+    def register_func(registry):
+        calls.append(registry)
+        if len(calls) == 1:
+            raise ValueError('first registration fails')
+        register_foo_plugin(registry)
+
+    parser = RootParser(register_default_parsers=False)
+    parser.register_lazy_plugin(LazyPlugin('foo', register_func, supported_exts={'.foo'},
+                                           supported_modules={'unknown_module'}))
+    with pytest.raises(ValueError):
+        parser.load_lazy_plugins()
+    assert [p.name for p in parser.get_lazy_plugins()] == ['foo']
+
+    parser.load_lazy_plugins()
+    assert parser.get_lazy_plugins() == []
+    assert len(parser.get_all_parsers()) == 1
+
+
+def test_lazy_plugins_do_not_modify_shared_registry(monkeypatch):
+    """ Checks that loading lazy plugins in a root parser does not modify the registry shared by the other ones """
+    # a new default instance, where no lazy plugin is loaded yet
+    monkeypatch.setattr(DefaultRootParser, '_instance', None)
+    parser = RootParser()
+    other = RootParser()
+    default_instance = DefaultRootParser._instance
+    nb_parsers = len(other.get_all_parsers())
+    assert len(other.get_lazy_plugins()) > 0
+
+    parser.load_lazy_plugins()
+    assert parser.get_lazy_plugins() == []
+    assert len(other.get_lazy_plugins()) > 0
+    assert len(other.get_all_parsers()) == nb_parsers
+    assert len(default_instance.get_lazy_plugins()) > 0
+
+    # the new root parsers share the registry where the plugins are loaded
+    assert DefaultRootParser._instance is not default_instance
+    new = RootParser()
+    assert new.get_lazy_plugins() == []
+    assert new._specific_parsers is parser._specific_parsers
+
+    # the multifile parsers of the shared registry look for their children's parsers in it
+    assert all(p.parser_finder is DefaultRootParser._instance
+               for p in parser._generic_parsers if hasattr(p, 'parser_finder'))
+
+
+def test_pandas_lazy_plugin_txt(tmpdir, monkeypatch):
+    """ Checks that parsing a .txt file into a str does not load the pandas plugin, while parsing it into a dict does,
+    since the pandas csv parser may lead to it """
+    tmpdir.join('a.txt').write('a=1')
+    monkeypatch.setattr(DefaultRootParser, '_instance', None)
+    parser = RootParser()
+
+    assert parser.parse_item(str(tmpdir.join('a')), str) == 'a=1'
+    assert 'pandas' in [p.name for p in parser.get_lazy_plugins()]
+
+    parser.parse_item(str(tmpdir.join('a')), dict)
+    assert 'pandas' not in [p.name for p in parser.get_lazy_plugins()]
@@ -1,11 +1,16 @@
+import gc
 from numbers import Integral
 from typing import Tuple, List, Dict, Set, Any, Union, Callable, Optional, TypeVar, Generic
+from weakref import ref
 
 from parsyfiles.type_inspection_tools import robust_isinstance, get_base_generic_type, is_collection, \
-    _extract_collection_base_type, get_all_subclasses, get_alternate_types_resolving_forwardref_union_and_typevar
+    _extract_collection_base_type, get_all_subclasses, get_alternate_types_resolving_forwardref_union_and_typevar, \
+    get_constructor_attributes_types, clear_constructor_attributes_types_cache, get_pretty_type_str
 
 import pytest
 
+import parsyfiles.type_inspection_tools as type_inspection_tools
+
 T = TypeVar('T')
 
 test_robust_isinstance_data = [
@@ -160,6 +165,43 @@ def test_get_subclasses_simple():
     assert get_all_subclasses(A) == [B, C]
 
 
+def test_get_all_subclasses_cache():
+    """ Tests that the subclasses found are cached, and found again when a new subclass is defined """
+
+    class A(object):
+        pass
+
+    class B(A):
+        pass
+
+    first = get_all_subclasses(A)
+    assert first == [B]
+    first.clear()
+    assert get_all_subclasses(A) == [B]
+
+    class C(B):
+        pass
+
+    assert get_all_subclasses(A) == [B, C]
+
+
+def test_get_all_subclasses_cache_weak():
+    """ Tests that the cache of subclasses does not prevent them from being garbage-collected """
+
+    class A(object):
+        pass
+
+    class B(A):
+        pass
+
+    assert get_all_subclasses(A) == [B]
+    b_ref = ref(B)
+    del B
+    gc.collect()
+    assert b_ref() is None
+    assert get_all_subclasses(A) == []
+
+
 def test_get_subclasses_generic():
     """ Tests that the method to get all subclasses works even in Generic cases """
 
@@ -216,3 +258,74 @@ def test_get_subclasses_generic():
 
 def test_get_subclasses_nonparam_dict():
     get_all_subclasses(Dict)
+
+
+def test_get_constructor_attributes_types_cache():
+    """ Tests that the constructor attributes are cached, until the constructor changes or the cache is cleared """
+
+    class A(object):
+        def __init__(self, a: int, b: str = None):
+            pass
+
+    first = get_constructor_attributes_types(A)
+    assert first == {'a': (int, True), 'b': (str, False)}
+    first.clear()
+    assert get_constructor_attributes_types(A) == {'a': (int, True), 'b': (str, False)}
+
+    def new_init(self, c: float):
+        pass
+
+    A.__init__ = new_init
+    assert get_constructor_attributes_types(A) == {'c': (float, True)}
+
+    new_init.__annotations__['c'] = int
+    assert get_constructor_attributes_types(A) == {'c': (float, True)}
+    clear_constructor_attributes_types_cache(A)
+    assert get_constructor_attributes_types(A) == {'c': (int, True)}
+
+
+def test_get_constructor_attributes_types_cache_size(monkeypatch):
+    """ Tests that the cache of constructor attributes only keeps the most recently used types alive """
+    monkeypatch.setattr(type_inspection_tools, 'TYPE_HELPERS_CACHE_SIZE', 2)
+
+    class A(object):
+        def __init__(self, a: int):
+            pass
+
+    class B(object):
+        def __init__(self, b: int):
+            pass
+
+    class C(object):
+        def __init__(self, c: int):
+            pass
+
+    assert get_constructor_attributes_types(A) == {'a': (int, True)}
+    a_ref = ref(A)
+    del A
+    assert get_constructor_attributes_types(B) == {'b': (int, True)}
+    assert get_constructor_attributes_types(C) == {'c': (int, True)}
+    gc.collect()
+    assert a_ref() is None
+
+
+def test_type_helpers_cache():
+    """ Checks that the cached type helpers are keyed on the type objects, and do not cache forward references """
+    assert get_alternate_types_resolving_forwardref_union_and_typevar(Union[int, str]) == (int, str)
+    assert get_alternate_types_resolving_forwardref_union_and_typevar(Union[str, int]) == (str, int)
+    assert get_pretty_type_str(Union[int, str]) == 'Union[int, str]'
+    assert get_pretty_type_str(Union[str, int]) == 'Union[str, int]'
+
+    # a constrained TypeVar accepts instances of any of its constraints
+    U = TypeVar('U', int, str)
+    assert robust_isinstance('r', U)
+    assert robust_isinstance(1, Optional[U])
+    assert not robust_isinstance(1.0, U)
+
+    # forward references are resolved with the caller's variables each time
+    Ref = str
+    assert get_alternate_types_resolving_forwardref_union_and_typevar(Optional['Ref']) == (str, type(None))
+    assert _extract_collection_base_type(List['Ref']) == (str, None)
+    Ref = int
+    assert get_alternate_types_resolving_forwardref_union_and_typevar(Optional['Ref']) == (int, type(None))
+    assert _extract_collection_base_type(List['Ref']) == (int, None)
@@ -1,4 +1,6 @@
+from functools import wraps
 from inspect import Parameter, signature, stack, getmodule
+from weakref import WeakKeyDictionary, ref
 from typing import TypeVar, MutableMapping, Dict, List, Set, Tuple, Type, Any, Mapping, Iterable, Optional, _ForwardRef, \
     Sequence
 from pytypes import is_subtype
@@ -19,6 +21,76 @@ class OrderedDictType(OrderedDict, MutableMapping[KT, VT], extra=OrderedDict):
         raise TypeError("Type OrderedDictType cannot be instantiated; use OrderedDict() instead")
 
 
+# the maximum number of results remembered by each of the type helpers decorated with @_type_helper_cache
+TYPE_HELPERS_CACHE_SIZE = 1024
+
+# all the caches created by @_type_helper_cache, so that they can be cleared together
+_type_helpers_caches = []
+
+
+def _type_helper_cache(f):
+    """
+    Decorator caching the results of a helper that is a pure function of the type objects it receives, in a LRU cache
+    of size TYPE_HELPERS_CACHE_SIZE. The cache is keyed on the identity of the arguments, and not on their equality,
+    since for example Union[int, str] == Union[str, int] while the order of their alternate types is different.
+    Cached arguments are kept alive by the cache, so that their ids can not be reused while they are in there.
+
+    Exceptions are not cached.
+
+    :param f:
+    :return:
+    """
+    cache = OrderedDict()
+    _type_helpers_caches.append(cache)
+
+    @wraps(f)
+    def cached_f(*args, **kwargs):
+        key = tuple(map(id, args)) + tuple((name, id(val)) for name, val in sorted(kwargs.items()))
+        try:
+            res = cache[key][1]
+        except KeyError:
+            res = f(*args, **kwargs)
+            cache[key] = ((args, kwargs), res)
+            if len(cache) > TYPE_HELPERS_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                # removed concurrently
+                pass
+        return res
+
+    return cached_f
+
+
+def clear_type_helpers_caches():
+    """
+    Clears the caches of the type helpers such as get_alternate_types_resolving_forwardref_union_and_typevar,
+    robust_isinstance, get_base_generic_type, is_collection or get_pretty_type_str.
+    """
+    for cache in _type_helpers_caches:
+        cache.clear()
+
+
+class _ForwardRefMet(Exception):
+    """ Raised by the cached version of a type helper when it meets a forward reference that needs to be resolved """
+
+
+def _refuse_forward_ref(typ):
+    """
+    Replacement for resolve_forward_ref used in the cached versions of the type helpers: resolving a forward reference
+    depends on the current stack, so the result can not be cached.
+
+    :param typ:
+    :return:
+    """
+    if is_forward_ref(typ):
+        raise _ForwardRefMet()
+    else:
+        return typ
+
+
 def get_alternate_types_resolving_forwardref_union_and_typevar(typ, _memo: List[Any] = None) \
         -> Tuple[Any, ...]:
     """
@@ -40,9 +112,41 @@ def get_alternate_types_resolving_forwardref_union_and_typevar(typ, _memo: List[
     Note that this function automatically prevent infinite recursion through forward references such as in
     `A = Union[str, 'A']`, by keeping a _memo of already met symbols.
 
+    The results are cached, except when a forward reference had to be evaluated.
+
     :param typ: 
     :return: 
     """
+    if _memo is None:
+        try:
+            return _get_alternate_types_cached(typ)
+        except _ForwardRefMet:
+            pass
+    return _get_alternate_types(typ, _memo=_memo)
+
+
+@_type_helper_cache
+def _get_alternate_types_cached(typ) -> Tuple[Any, ...]:
+    """
+    Cached version of _get_alternate_types, raising a _ForwardRefMet if a forward reference needs to be evaluated
+
+    :param typ:
+    :return:
+    """
+    return _get_alternate_types(typ, resolve_fwd_ref=_refuse_forward_ref)
+
+
+def _get_alternate_types(typ, _memo: List[Any] = None, resolve_fwd_ref=None) -> Tuple[Any, ...]:
+    """
+    Implementation of get_alternate_types_resolving_forwardref_union_and_typevar, without cache
+
+    :param typ:
+    :param _memo:
+    :param resolve_fwd_ref: the function to use to resolve forward references. Default is resolve_forward_ref
+    :return:
+    """
+    resolve_fwd_ref = resolve_fwd_ref or resolve_forward_ref
+
     # avoid infinite recursion by using a _memo
     _memo = _memo or []
     if typ in _memo:
@@ -58,7 +162,7 @@ def get_alternate_types_resolving_forwardref_union_and_typevar(typ, _memo: List[
                 raise Exception('Contravariant TypeVars are not supported')
             else:
                 # only subclasses of this are allowed (even if not covariant, because as of today we cant do otherwise)
-                return get_alternate_types_resolving_forwardref_union_and_typevar(typ.__bound__, _memo=_memo)
+                return _get_alternate_types(typ.__bound__, _memo=_memo, resolve_fwd_ref=resolve_fwd_ref)
 
         elif hasattr(typ, '__constraints__') and typ.__constraints__ is not None:
             if hasattr(typ, '__contravariant__') and typ.__contravariant__:
@@ -68,7 +172,7 @@ def get_alternate_types_resolving_forwardref_union_and_typevar(typ, _memo: List[
                 # TypeVar is 'constrained' to several alternate classes, meaning that subclasses of any of them are
                 # allowed (even if not covariant, because as of today we cant do otherwise)
                 return tuple(typpp for c in typ.__constraints__
-                             for typpp in get_alternate_types_resolving_forwardref_union_and_typevar(c, _memo=_memo))
+                             for typpp in _get_alternate_types(c, _memo=_memo, resolve_fwd_ref=resolve_fwd_ref))
 
         else:
             # A non-parametrized TypeVar means 'any'
@@ -78,10 +182,10 @@ def get_alternate_types_resolving_forwardref_union_and_typevar(typ, _memo: List[
         # do not use typ.__args__, it may be wrong
         # the solution below works even in typevar+config cases such as u = Union[T, str][Optional[int]]
         return tuple(t for typpp in get_args(typ, evaluate=True)
-                     for t in get_alternate_types_resolving_forwardref_union_and_typevar(typpp, _memo=_memo))
+                     for t in _get_alternate_types(typpp, _memo=_memo, resolve_fwd_ref=resolve_fwd_ref))
 
     elif is_forward_ref(typ):
-        return get_alternate_types_resolving_forwardref_union_and_typevar(resolve_forward_ref(typ), _memo=_memo)
+        return _get_alternate_types(resolve_fwd_ref(typ), _memo=_memo, resolve_fwd_ref=resolve_fwd_ref)
 
     else:
         return typ,
@@ -93,28 +197,47 @@ def robust_isinstance(inst, typ) -> bool:
     class so that the instance check works. It is also robust to Union and Any.
 
     :param inst:
+    :param typ:
+    :return:
+    """
+    targets = _get_isinstance_targets(typ)
+    return targets is None or isinstance(inst, targets)
+
+
+@_type_helper_cache
+def _get_isinstance_targets(typ) -> Optional[Tuple[type, ...]]:
+    """
+    Returns the tuple of classes that instances of typ should be an instance of, or None if anything is allowed (Any,
+    raw TypeVar, or Union containing one of them).
+
     :param typ:
     :return:
     """
     if typ is Any:
-        return True
+        return None
     if is_typevar(typ):
-        if hasattr(typ, '__constraints__') and typ.__constraints__ is not None:
-            typs = get_args(typ, evaluate=True)
-            return any(robust_isinstance(inst, t) for t in typs)
+        if hasattr(typ, '__constraints__') and typ.__constraints__:
+            typs = typ.__constraints__
         elif hasattr(typ, '__bound__') and typ.__bound__ is not None:
-            return robust_isinstance(inst, typ.__bound__)
+            return _get_isinstance_targets(typ.__bound__)
         else:
             # a raw TypeVar means 'anything'
-            return True
+            return None
+    elif is_union_type(typ):
+        typs = get_args(typ, evaluate=True)
     else:
-        if is_union_type(typ):
-            typs = get_args(typ, evaluate=True)
-            return any(robust_isinstance(inst, t) for t in typs)
-        else:
-            return isinstance(inst, get_base_generic_type(typ))
+        return get_base_generic_type(typ),
 
+    targets = []
+    for t in typs:
+        t_targets = _get_isinstance_targets(t)
+        if t_targets is None:
+            return None
+        targets += t_targets
+    return tuple(targets)
 
+
+@_type_helper_cache
 def get_pretty_type_str(object_type) -> str:
     """
     Utility method to check if a type is a subclass of typing.{List,Dict,Set,Tuple}. In that case returns a
@@ -184,6 +307,7 @@ def get_pretty_type_keys_dict(dict: Dict[Any, Any]) -> Dict[str, Any]:
 #     #         raise e
 
 
+@_type_helper_cache
 def get_base_generic_type(object_type):
     """
     Utility method to return the equivalent non-customized type for a Generic type, including user-defined ones.
@@ -225,6 +349,7 @@ def is_typed_collection(object_type) -> bool:
            _extract_collection_base_type(object_type, exception_if_none=False)[0] is not None
 
 
+@_type_helper_cache
 def is_collection(object_type, strict: bool = False) -> bool:
     """
     Utility method to check if a type is a subclass of typing.{List,Dict,Set,Tuple}
@@ -259,11 +384,80 @@ def is_collection(object_type, strict: bool = False) -> bool:
                or issubclass(object_type, set)
 
 
+# the results of get_all_subclasses for each type: typ > (classes tree when the result was computed, result). Only weak
+# references to the classes are held, so that the cache does not prevent them from being garbage-collected.
+_subclasses_cache = WeakKeyDictionary()
+
+
 def get_all_subclasses(typ, recursive: bool = True, _memo = None) -> Sequence[Type[Any]]:
     """
     Returns all subclasses, and supports generic types. It is recursive by default
     See discussion at https://github.com/Stewori/pytypes/issues/31
 
+    The results of recursive searches are cached. A cache entry remains valid as long as the tree of classes found
+    through __subclasses__() does not change (a new subclass is defined or an old one is garbage-collected). This
+    check does not involve any pytypes call, so it is much cheaper than the search itself. The cache only holds weak
+    references to the classes, so it does not prevent them from being garbage-collected.
+
+    :param typ:
+    :param recursive: a boolean indicating whether recursion is needed
+    :param _memo: internal variable used in recursion to avoid exploring subclasses that were already explored
+    :return:
+    """
+    if not recursive or _memo is not None:
+        return _get_all_subclasses(typ, recursive=recursive, _memo=_memo)
+
+    try:
+        cached_tree, cached_res = _subclasses_cache[typ]
+    except KeyError:
+        cached_tree, cached_res = None, None
+    except TypeError:
+        # unhashable type or type that can not be weakly referenced: no cache
+        return _get_all_subclasses(typ)
+
+    # weak references to alive classes are equal if the classes are equal. A dead one is only equal to itself.
+    tree = tuple(ref(t) for t in _get_subclasses_tree(typ))
+    if cached_tree == tree:
+        res = [r() for r in cached_res]
+        if None not in res:
+            return res
+
+    res = _get_all_subclasses(typ)
+    try:
+        _subclasses_cache[typ] = (tree, tuple(ref(t) for t in res))
+    except TypeError:
+        # a result can not be weakly referenced: no cache
+        pass
+    return list(res)
+
+
+def _get_subclasses_tree(typ) -> Tuple[Type[Any], ...]:
+    """
+    Returns all classes found by calling __subclasses__() recursively on typ (on its origin for generic types), in a
+    deterministic order. This is what get_all_subclasses explores, before filtering the results with pytypes.
+
+    :param typ:
+    :return:
+    """
+    res = []
+    explored = set()
+    to_explore = [get_origin(typ) if is_generic_type(typ) else typ]
+    while len(to_explore) > 0:
+        t = to_explore.pop()
+        if not isinstance(t, type):
+            continue
+        for sub in type.__subclasses__(t):
+            if sub not in explored:
+                explored.add(sub)
+                res.append(sub)
+                to_explore.append(sub)
+    return tuple(res)
+
+
+def _get_all_subclasses(typ, recursive: bool = True, _memo = None) -> Sequence[Type[Any]]:
+    """
+    Implementation of get_all_subclasses, without the cache
+
     :param typ:
     :param recursive: a boolean indicating whether recursion is needed
     :param _memo: internal variable used in recursion to avoid exploring subclasses that were already explored
@@ -298,7 +492,7 @@ def get_all_subclasses(typ, recursive: bool = True, _memo = None) -> Sequence[Ty
     # recurse
     if recursive:
         for typpp in sub_list:
-            for t in get_all_subclasses(typpp, recursive=True, _memo=_memo):
+            for t in _get_all_subclasses(typpp, recursive=True, _memo=_memo):
                 # unfortunately we have to check 't not in sub_list' because with generics strange things happen
                 # also is_subtype returns false when the parent is a generic
                 if t not in sub_list and is_subtype(t, typ, bound_typevars={}):
@@ -412,6 +606,43 @@ def is_pep484_nonable(typ):
 def _extract_collection_base_type(collection_object_type, exception_if_none: bool = True,
                                   resolve_fwd_refs: bool = True) -> Tuple[Type, Optional[Type]]:
     """
+    Utility method to extract the base item type from a collection/iterable item type. See
+    _do_extract_collection_base_type for details. The results are cached, except when a forward reference had to be
+    evaluated.
+
+    :param collection_object_type:
+    :param exception_if_none:
+    :param resolve_fwd_refs:
+    :return:
+    """
+    if resolve_fwd_refs:
+        try:
+            return _extract_collection_base_type_cached(collection_object_type, exception_if_none,
+                                                        resolve_fwd_ref=_refuse_forward_ref)
+        except _ForwardRefMet:
+            return _do_extract_collection_base_type(collection_object_type, exception_if_none,
+                                                    resolve_fwd_ref=resolve_forward_ref)
+    else:
+        return _extract_collection_base_type_cached(collection_object_type, exception_if_none, resolve_fwd_ref=None)
+
+
+@_type_helper_cache
+def _extract_collection_base_type_cached(collection_object_type, exception_if_none, resolve_fwd_ref) \
+        -> Tuple[Type, Optional[Type]]:
+    """
+    Cached version of _do_extract_collection_base_type
+
+    :param collection_object_type:
+    :param exception_if_none:
+    :param resolve_fwd_ref:
+    :return:
+    """
+    return _do_extract_collection_base_type(collection_object_type, exception_if_none, resolve_fwd_ref=resolve_fwd_ref)
+
+
+def _do_extract_collection_base_type(collection_object_type, exception_if_none: bool = True,
+                                     resolve_fwd_ref=None) -> Tuple[Type, Optional[Type]]:
+    """
     Utility method to extract the base item type from a collection/iterable item type.
     Throws
     * a TypeError if the collection_object_type a Dict with non-string keys.
@@ -421,9 +652,12 @@ def _extract_collection_base_type(collection_object_type, exception_if_none: boo
     were specified without inner content types (as in Dict instead of Dict[str, Foo])
 
     :param collection_object_type:
+    :param exception_if_none:
+    :param resolve_fwd_ref: the function to use to resolve forward references, or None to leave them as is
     :return: a tuple containing the collection's content type (which may itself be a Tuple in case of a Tuple) and the
     collection's content key type for dicts (or None)
     """
+    resolve_fwd_refs = resolve_fwd_ref is not None
     contents_item_type = None
     contents_key_type = None
 
@@ -499,7 +733,7 @@ def _extract_collection_base_type(collection_object_type, exception_if_none: boo
 
                 # Resolve any forward references if needed
                 if resolve_fwd_refs:
-                    t = resolve_forward_ref(t)
+                    t = resolve_fwd_ref(t)
                 resolved.append(t)
 
                 # Final type hint compliance
@@ -513,7 +747,7 @@ def _extract_collection_base_type(collection_object_type, exception_if_none: boo
             # --- Not a tuple
             # resolve any forward references first
             if resolve_fwd_refs:
-                contents_item_type = resolve_forward_ref(contents_item_type)
+                contents_item_type = resolve_fwd_ref(contents_item_type)
 
             # check validity then
             if not is_valid_pep484_type_hint(contents_item_type):
@@ -570,11 +804,69 @@ def get_validated_attribute_type_info(typ, item_type, attr_name):
     return typ
 
 
+# the results of get_constructor_attributes_types for each type, in least recently used order and limited to
+# TYPE_HELPERS_CACHE_SIZE entries: id(item_type) > (item_type, constructor, result)
+_constructor_attributes_types_cache = OrderedDict()
+
+
 def get_constructor_attributes_types(item_type) -> Dict[str, Tuple[Type[Any], bool]]:
     """
     Utility method to return a dictionary of attribute name > attribute type from the constructor of a given type
     It supports PEP484 and 'attrs' declaration, see https://github.com/python-attrs/attrs.
 
+    The results are cached for each type, as long as its constructor is the same object. If the type hints change in
+    another way (for example forward references that now resolve to other classes), use
+    clear_constructor_attributes_types_cache. As for the type helpers, the cache is keyed on the identity of the type
+    and only remembers the TYPE_HELPERS_CACHE_SIZE most recently used types.
+
+    :param item_type:
+    :return: a dictionary containing for each attr name, a tuple (type, is_mandatory). It is a copy and may be
+    modified by the caller
+    """
+    constructor = getattr(item_type, '__init__', None)
+    key = id(item_type)
+    try:
+        _, cached_constructor, res = _constructor_attributes_types_cache[key]
+    except KeyError:
+        cached_constructor, res = None, None
+
+    if res is None or cached_constructor is not constructor:
+        # errors are not cached, they are raised again next time
+        res = _get_constructor_attributes_types(item_type)
+        # the type is kept alive in the entry, so that its id can not be reused while it is in there
+        _constructor_attributes_types_cache[key] = (item_type, constructor, res)
+        while len(_constructor_attributes_types_cache) > TYPE_HELPERS_CACHE_SIZE:
+            try:
+                _constructor_attributes_types_cache.popitem(last=False)
+            except KeyError:
+                # emptied concurrently
+                break
+    else:
+        try:
+            _constructor_attributes_types_cache.move_to_end(key)
+        except KeyError:
+            # removed concurrently
+            pass
+    return dict(res)
+
+
+def clear_constructor_attributes_types_cache(item_type=None):
+    """
+    Clears the cache of get_constructor_attributes_types, for the given type only or for all types if None
+
+    :param item_type:
+    :return:
+    """
+    if item_type is None:
+        _constructor_attributes_types_cache.clear()
+    else:
+        _constructor_attributes_types_cache.pop(id(item_type), None)
+
+
+def _get_constructor_attributes_types(item_type) -> Dict[str, Tuple[Type[Any], bool]]:
+    """
+    Implementation of get_constructor_attributes_types, without the cache
+
     :param item_type:
     :return: a dictionary containing for each attr name, a tuple (type, is_mandatory)
     """